@@ -0,0 +1,190 @@
+"""
+History compaction for tool-heavy agent sessions.
+
+Every tool result stays in the session and is resent on every later model call, so long article
+lists, joined article content and journey tables make each turn slower than the last. The compactor
+runs as a before_model_callback: when the request's history passes a token budget, tool results
+older than the last few user turns are replaced (oldest first) by a short summary and a reference,
+until the history fits. The session itself is untouched; only the outgoing request is compacted.
+
+The reference is the tool name and the function call id (or, when the request carries none, a
+digest of the result). The compactor keeps the full results it shortened in memory, bounded to the
+max_stored most recently used, and its recall_tool_result tool returns one again when the summary
+is not enough. Nothing is copied into the session state. A result evicted from the store, or
+compacted by another process, can no longer be recalled; the model then works from the summary.
+
+Tokens are estimated as characters / 4. Each request logs the estimated prompt tokens
+with and without compaction, and the totals are kept on the compactor and in the session state
+(compaction_prompt_tokens).
+"""
+
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+METRICS_KEY = "compaction_prompt_tokens"
+SAMPLE_ROWS = 3
+SAMPLE_CHARS = 300
+MAX_STORED_RESULTS = 256
+
+
+def estimate_tokens(value) -> int:
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(value) // CHARS_PER_TOKEN
+
+
+def content_tokens(content: types.Content) -> int:
+    total = 0
+    for part in content.parts or []:
+        if part.text:
+            total += estimate_tokens(part.text)
+        if part.function_call:
+            total += estimate_tokens(part.function_call.args) + estimate_tokens(part.function_call.name)
+        if part.function_response:
+            total += estimate_tokens(part.function_response.response)
+    return total
+
+
+def _truncate(value, limit: int = SAMPLE_CHARS) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def summarize_result(result) -> str:
+    """One or two lines describing a tool result: row count, columns and the first rows."""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except json.JSONDecodeError:
+            return f"{len(result)} characters: {_truncate(result)}"
+    if isinstance(result, list):
+        if not result:
+            return "no rows"
+        columns = list(result[0]) if isinstance(result[0], dict) else []
+        summary = f"{len(result)} rows"
+        if columns:
+            summary += f", columns: {', '.join(columns)}"
+        return summary + f"; first rows: {_truncate(result[:SAMPLE_ROWS])}"
+    if isinstance(result, dict):
+        return f"object with keys {', '.join(map(str, result))}: {_truncate(result)}"
+    return _truncate(result)
+
+
+def _reference(name: str, call_id: Optional[str], response: Dict) -> str:
+    if call_id:
+        return f"{name}:{call_id}"
+    digest = hashlib.sha1(json.dumps(response, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return f"{name}:{digest}"
+
+
+class HistoryCompactor:
+    """before_model_callback that keeps the request's tool results within a token budget."""
+
+    def __init__(self, token_budget: int = 4000, keep_recent_turns: int = 2, min_result_tokens: int = 200,
+                 max_stored: int = MAX_STORED_RESULTS):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.min_result_tokens = min_result_tokens
+        self.max_stored = max_stored
+        self.stored: "OrderedDict[str, Dict]" = OrderedDict()  # ref -> full result, least recently used first
+        # Add this tool to the agent's tools
+        self.recall_tool_result = self._recall_tool()
+        self.stats = {"requests": 0, "compacted_requests": 0, "prompt_tokens": 0, "prompt_tokens_uncompacted": 0}
+
+    def _recent_start(self, contents: List[types.Content]) -> int:
+        """Index of the content starting the last keep_recent_turns user turns."""
+        seen = 0
+        for index in range(len(contents) - 1, -1, -1):
+            content = contents[index]
+            if content.role == "user" and any(part.text for part in content.parts or []):
+                seen += 1
+                if seen == self.keep_recent_turns:
+                    return index
+        return 0
+
+    def _store(self, ref: str, response: Dict) -> None:
+        self.stored[ref] = response
+        self.stored.move_to_end(ref)
+        while len(self.stored) > self.max_stored:
+            self.stored.popitem(last=False)
+
+    def _compact_part(self, part: types.Part) -> types.Part:
+        response = part.function_response
+        ref = _reference(response.name, response.id, response.response)
+        self._store(ref, response.response)
+        result = response.response.get("result", response.response) if response.response else None
+        return types.Part(function_response=types.FunctionResponse(
+            id=response.id,
+            name=response.name,
+            response={
+                "compacted": True,
+                "ref": ref,
+                "summary": summarize_result(result),
+                "note": "Older result shortened; call recall_tool_result with ref for the full result.",
+            },
+        ))
+
+    def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        contents = llm_request.contents or []
+        before = sum(content_tokens(content) for content in contents)
+        after = before
+
+        if before > self.token_budget:
+            # Stale results are compacted oldest first until the history fits
+            stale = []
+            for index, content in enumerate(contents[:self._recent_start(contents)]):
+                for position, part in enumerate(content.parts or []):
+                    if part.function_response:
+                        tokens = estimate_tokens(part.function_response.response)
+                        if tokens >= self.min_result_tokens:
+                            stale.append((index, position, tokens))
+
+            for index, position, tokens in stale:
+                if after <= self.token_budget:
+                    break
+                content = contents[index]
+                parts = list(content.parts)
+                parts[position] = self._compact_part(parts[position])
+                after += estimate_tokens(parts[position].function_response.response) - tokens
+                # Replace the content instead of editing it, so session events are never modified
+                contents[index] = types.Content(role=content.role, parts=parts)
+
+        self.stats["requests"] += 1
+        self.stats["prompt_tokens"] += after
+        self.stats["prompt_tokens_uncompacted"] += before
+        metrics = dict(callback_context.state.get(METRICS_KEY) or {"with": 0, "without": 0})
+        metrics["with"] += after
+        metrics["without"] += before
+        callback_context.state[METRICS_KEY] = metrics
+        if after < before:
+            self.stats["compacted_requests"] += 1
+        logger.info(f"Prompt history: ~{before} tokens, ~{after} after compaction "
+                    f"(session total ~{metrics['without']} -> ~{metrics['with']})")
+        return None
+
+
+    def _recall_tool(self) -> Callable:
+        def recall_tool_result(ref: str) -> dict:
+            """
+            Returns the full result of an earlier tool call that was shortened in the conversation history.
+            ref is the 'ref' value of the shortened result, e.g. 'get_articles_by_status:1a2b3c4d5e6f'.
+            """
+            if ref not in self.stored:
+                return {"status": "error", "message": f"The result '{ref}' is no longer stored; use its summary "
+                                                      f"or call the tool again."}
+            self.stored.move_to_end(ref)
+            return self.stored[ref]
+
+        return recall_tool_result
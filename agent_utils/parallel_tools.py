@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrent execution of the tool calls a model emits in one turn.
+
+ADK already starts every function call of a model turn as its own task and merges the responses
+back in call order, but a synchronous tool (ToolboxSyncTool, the facility resolver wrappers, the
+analytics functions) blocks the event loop while it runs, so the calls still execute one after
+another. parallel_tools() wraps each tool as an async function with the same name, docstring and
+signature (so the model sees the same declaration) that runs the tool on a thread pool, under a
+concurrency limit shared by all tools of the agent and with a per-call timeout. Five facilities x
+two tools then take about as long as the slowest call instead of the sum of all ten.
+
+A call that times out returns {"status": "error", ...} to the model. Its thread cannot be
+interrupted and finishes in the background, still holding a pool thread until it does.
+
+Usage (from the repository root, with the toolbox running):
+    python -m agent_utils.parallel_tools \
+        --call get_articles_dwelling_at_facility facilityId=FAC1 --call get_articles_dwelling_at_facility facilityId=FAC2 \
+        --call get_intransit_articles_to_facility facilityId=FAC1 --call get_intransit_articles_to_facility facilityId=FAC2
+"""
+
+import time
+import asyncio
+import logging
+import weakref
+import argparse
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30.0
+
+
+class ToolExecutor:
+    """Runs synchronous tools on a bounded thread pool from async wrappers."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tool")
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.inflight = 0
+        self.stats = {"calls": 0, "timeouts": 0, "max_inflight": 0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # One per event loop, since the same tools may be served from several loops
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    def wrap(self, tool: Callable) -> Callable:
+        """Async version of tool with the same name, docstring and signature."""
+        name = getattr(tool, "__name__", repr(tool))
+
+        @functools.wraps(tool)
+        async def wrapper(*args, **kwargs):
+            async with self._semaphore():
+                self.inflight += 1
+                self.stats["calls"] += 1
+                self.stats["max_inflight"] = max(self.stats["max_inflight"], self.inflight)
+                # Keep the caller's context (e.g. tracing spans) in the worker thread
+                call = functools.partial(contextvars.copy_context().run, tool, *args, **kwargs)
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.get_running_loop().run_in_executor(self.executor, call), self.timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    logger.warning(f"Tool {name} timed out after {self.timeout}s")
+                    return {"status": "error",
+                            "message": f"{name} did not answer within {self.timeout:g} seconds. Try again or narrow the request."}
+                finally:
+                    self.inflight -= 1
+
+        return wrapper
+
+
+def parallel_tools(tools: Sequence[Callable], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                   timeout: float = DEFAULT_TIMEOUT) -> List[Callable]:
+    """Wrap synchronous tools so the calls of one model turn run concurrently; async tools are kept as they are."""
+    executor = ToolExecutor(max_concurrency, timeout)
+    return [tool if asyncio.iscoroutinefunction(tool) else executor.wrap(tool) for tool in tools]
+
+
+def main():
+    """Time a set of toolbox calls run one after another and run through parallel_tools."""
+    from toolbox_core import ToolboxSyncClient
+
+    parser = argparse.ArgumentParser(description="Compare sequential and parallel tool calls.")
+    parser.add_argument("--url", default="http://127.0.0.1:5001", help="toolbox server url")
+    parser.add_argument("--call", nargs="+", action="append", required=True, metavar="TOOL [PARAM=VALUE ...]",
+                        help="a tool call; repeat for each call")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    client = ToolboxSyncClient(args.url)
+    try:
+        tools = {tool.__name__: tool for tool in client.load_toolset()}
+        calls = [(call[0], dict(param.split("=", 1) for param in call[1:])) for call in args.call]
+
+        start = time.perf_counter()
+        for name, params in calls:
+            tools[name](**params)
+        sequential = time.perf_counter() - start
+
+        wrapped = dict(zip(tools, parallel_tools(list(tools.values()), args.max_concurrency, args.timeout)))
+
+        async def fan_out():
+            return await asyncio.gather(*(wrapped[name](**params) for name, params in calls))
+
+        start = time.perf_counter()
+        asyncio.run(fan_out())
+        parallel = time.perf_counter() - start
+    finally:
+        client.close()
+
+    print(f"{len(calls)} calls: sequential {sequential * 1000:.0f} ms, parallel {parallel * 1000:.0f} ms "
+          f"({sequential / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
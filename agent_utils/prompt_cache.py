@@ -0,0 +1,218 @@
+"""
+Prompt-prefix caching for agents with long static instructions.
+
+The system instruction and tool declarations of an agent are the same on every model call, and
+they are resent in full each time. The PromptCache before_model_callback fingerprints that prefix
+(sha256 of the model, the instruction and the tool declarations), registers it once with Gemini
+context caching, and then sends only the cache name in place of the prefix. The cache is shared by every
+session in the process, renewed before its TTL runs out, and replaced when the fingerprint changes.
+A replaced cache is not deleted: requests already rewritten to use it may still be in flight, so
+it is left to expire with its TTL.
+
+Prefixes below the model's minimum cacheable size are sent as usual. With LocalCacheBackend nothing
+is sent anywhere: requests are left unchanged and the callback only counts the prefix tokens
+a real cache would have avoided, e.g. for local runs and tests.
+
+Add the callback last in before_model_callback (it only rewrites requests that go to the model),
+prompt_cache.after_model as after_model_callback to log cached tokens and latency of hits and misses,
+and prompt_cache.on_model_error as on_model_error_callback so failed calls are not timed.
+"""
+
+import os
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .history_compaction import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+# Renew a cache this long before it expires, so no request races the expiry
+RENEW_MARGIN_SECONDS = 120
+# Gemini 2.5 models do not cache prefixes shorter than this
+MIN_CACHE_TOKENS = 1024
+# Model calls not finished after this long (e.g. cancelled) are no longer timed
+STARTED_TTL_SECONDS = 600
+
+
+def _declarations(config: types.GenerateContentConfig) -> list:
+    return [tool.model_dump(exclude_none=True, mode="json") for tool in config.tools or []]
+
+
+def prefix_fingerprint(llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    payload = {
+        "model": llm_request.model,
+        "system_instruction": str(config.system_instruction or ""),
+        "tools": _declarations(config),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def prefix_tokens(llm_request: LlmRequest) -> int:
+    config = llm_request.config
+    return estimate_tokens(str(config.system_instruction or "")) + estimate_tokens(_declarations(config))
+
+
+class GeminiCacheBackend:
+    """Registers prefixes with the Gemini API / Vertex AI context cache."""
+
+    rewrites_request = True
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        return self._client
+
+    async def create(self, llm_request: LlmRequest, fingerprint: str) -> str:
+        config = llm_request.config
+        cache = await self.client.aio.caches.create(
+            model=llm_request.model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"prefix-{fingerprint[:16]}",
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                ttl=f"{self.ttl_seconds}s",
+            ),
+        )
+        return cache.name
+
+
+class LocalCacheBackend:
+    """Stand-in that registers nothing and leaves requests unchanged; only the savings are counted."""
+
+    rewrites_request = False
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.created = 0
+
+    async def create(self, llm_request: LlmRequest, fingerprint: str) -> str:
+        self.created += 1
+        return f"local/{fingerprint[:16]}"
+
+
+@dataclass
+class CachedPrefix:
+    name: str
+    fingerprint: str
+    tokens: int
+    expires_at: float
+    uses: int = 0
+
+
+class PromptCache:
+    """before_model_callback that replaces an agent's static prompt prefix with a context cache."""
+
+    def __init__(self, backend=None, min_tokens: int = MIN_CACHE_TOKENS, enabled: bool = True):
+        self.backend = backend or GeminiCacheBackend()
+        self.enabled = enabled
+        self.min_tokens = min_tokens
+        self.prefixes: Dict[str, CachedPrefix] = {}  # agent name -> current cache
+        self.failed = set()  # fingerprints the backend refused, not retried
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.started: Dict[str, tuple] = {}  # invocation + agent -> (start, hit) of the call in flight
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "prefix_tokens_avoided": 0,
+                      "hit_latency_ms": 0.0, "miss_latency_ms": 0.0, "cached_tokens_reported": 0}
+
+    async def _current(self, agent: str, llm_request: LlmRequest) -> Optional[CachedPrefix]:
+        fingerprint = prefix_fingerprint(llm_request)
+        if fingerprint in self.failed:
+            return None
+        async with self.locks.setdefault(agent, asyncio.Lock()):
+            cached = self.prefixes.get(agent)
+            if cached and cached.fingerprint == fingerprint and time.time() < cached.expires_at - RENEW_MARGIN_SECONDS:
+                return cached
+
+            tokens = prefix_tokens(llm_request)
+            if tokens < self.min_tokens:
+                logger.info(f"Prompt prefix of {agent} is ~{tokens} tokens, below the {self.min_tokens} token minimum; not cached")
+                self.failed.add(fingerprint)
+                return None
+            try:
+                name = await self.backend.create(llm_request, fingerprint)
+            except Exception as e:
+                logger.warning(f"Could not cache the prompt prefix of {agent}: {e}")
+                self.failed.add(fingerprint)
+                return None
+
+            self.stats["created"] += 1
+            reason = "changed" if cached and cached.fingerprint != fingerprint else "registered"
+            self.prefixes[agent] = CachedPrefix(name, fingerprint, tokens, time.time() + self.backend.ttl_seconds)
+            logger.info(f"Prompt prefix of {agent} {reason}: {name} (~{tokens} tokens, sha256 {fingerprint[:12]})")
+            # The old cache is not deleted: in-flight requests may still reference it until its TTL
+            return self.prefixes[agent]
+
+    def _expire_started(self) -> None:
+        # Cancelled calls reach neither after_model nor on_model_error
+        cutoff = time.perf_counter() - STARTED_TTL_SECONDS
+        for key in [key for key, (start, _) in self.started.items() if start < cutoff]:
+            del self.started[key]
+
+    async def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        if not self.enabled:
+            return None
+        cached = await self._current(callback_context.agent_name, llm_request)
+        hit = cached is not None
+        self._expire_started()
+        self.started[callback_context.invocation_id + callback_context.agent_name] = (time.perf_counter(), hit)
+        if not hit:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        cached.uses += 1
+        # Registering the prefix costs its tokens once, so the first use saves nothing
+        if cached.uses > 1:
+            self.stats["prefix_tokens_avoided"] += cached.tokens
+        if self.backend.rewrites_request:
+            llm_request.config.cached_content = cached.name
+            llm_request.config.system_instruction = None
+            llm_request.config.tools = None
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        """after_model_callback: record latency and the cached tokens the model reports."""
+        if not self.enabled:
+            return None
+        key = callback_context.invocation_id + callback_context.agent_name
+        # Streamed responses call this once per chunk; the latency is taken at the final response
+        if key in self.started and not llm_response.partial:
+            start, hit = self.started.pop(key)
+            self.stats["hit_latency_ms" if hit else "miss_latency_ms"] += (time.perf_counter() - start) * 1000
+        usage = llm_response.usage_metadata
+        if usage is not None and not llm_response.partial:
+            cached_tokens = usage.cached_content_token_count or 0
+            self.stats["cached_tokens_reported"] += cached_tokens
+            logger.info(f"{callback_context.agent_name}: {usage.prompt_token_count} prompt tokens, {cached_tokens} from cache "
+                        f"(~{self.stats['prefix_tokens_avoided']} prefix tokens avoided so far)")
+        return None
+
+    def on_model_error(self, callback_context: CallbackContext, llm_request: LlmRequest,
+                       error: Exception) -> Optional[LlmResponse]:
+        """on_model_error_callback: forget the start time of the failed call; the error is raised as usual."""
+        self.started.pop(callback_context.invocation_id + callback_context.agent_name, None)
+        return None
+
+
+def prompt_cache_from_env() -> PromptCache:
+    """PromptCache chosen by PROMPT_CACHE: 'gemini' (default), 'local' or 'off'."""
+    mode = os.getenv("PROMPT_CACHE", "gemini").lower()
+    ttl = int(os.getenv("PROMPT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    backend = LocalCacheBackend(ttl) if mode == "local" else GeminiCacheBackend(ttl)
+    return PromptCache(backend, enabled=mode != "off")
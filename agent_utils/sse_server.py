@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Server-sent events front end for the root agents.
+
+Runs the agents with RunConfig(streaming_mode=StreamingMode.SSE) and forwards what happens while
+the run is in progress, instead of returning only the final response:
+    event: progress  {"stage": "started"}                      as soon as the request is accepted
+    event: progress  {"stage": "agent", "agent": ..., "label": "store_database_agent is working"}
+    event: progress  {"stage": "tool", "tool": ..., "label": "querying orders"}
+    event: token     {"agent": ..., "text": ...}               partial model output
+    event: done      {"text": ..., "ttftMs": ..., "totalMs": ...}
+    event: error     {"message": ...}
+
+Time to first byte is the 'started' event, time to first token the first 'token' event; neither
+waits for the multi-agent run or the final generation to finish.
+
+A request without session_id starts a new session (its id is in the 'started' event). An unknown
+session_id is answered with 404 instead of silently starting an empty conversation, unless
+create_session is set, which creates the session under the client's id.
+
+Usage (from the repository root):
+    python -m agent_utils.sse_server serve --agents dnm_conversations neo4j_mcp_integration bigquery_adk_integration
+    curl -N -X POST localhost:8080/apps/dnm_conversations/stream -H 'Content-Type: application/json' \
+        -d '{"user_id": "u1", "session_id": "s1", "create_session": true, "message": "Is the network busy?"}'
+    python -m agent_utils.sse_server measure dnm_conversations "Is the network busy?" "Where is ART-12?"
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import importlib
+import statistics
+from typing import AsyncGenerator, Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+DEFAULT_AGENTS = ["dnm_conversations", "neo4j_mcp_integration", "bigquery_adk_integration"]
+
+# What the user sees while a tool runs; other tools show 'running <tool>'
+PROGRESS_LABELS = {
+    "get_latest_order": "looking up the latest order",
+    "execute_sql": "querying orders",
+    "update_order_status": "updating the order status",
+    "get_table_info": "reading the orders table schema",
+    "transfer_to_agent": "handing over",
+}
+
+
+class StreamRequest(BaseModel):
+    message: str
+    user_id: str = "user"
+    session_id: Optional[str] = None
+    create_session: bool = False  # create session_id if it does not exist yet
+
+
+def sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def tool_label(name: str) -> str:
+    return PROGRESS_LABELS.get(name, f"running {name}")
+
+
+async def stream_run(runner: Runner, user_id: str, session_id: str, message: str) -> AsyncGenerator[str, None]:
+    """Run the agent once and yield SSE frames as events arrive."""
+    start = time.perf_counter()
+    yield sse("progress", {"stage": "started", "sessionId": session_id})
+
+    first_token_ms = None
+    current_agent = None
+    final_text = []
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    new_message = types.Content(role="user", parts=[types.Part(text=message)])
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session_id,
+                                            new_message=new_message, run_config=run_config):
+            if event.author and event.author not in ("user", current_agent):
+                current_agent = event.author
+                yield sse("progress", {"stage": "agent", "agent": current_agent, "label": f"{current_agent} is working"})
+
+            for call in event.get_function_calls():
+                yield sse("progress", {"stage": "tool", "agent": event.author, "tool": call.name,
+                                       "label": tool_label(call.name)})
+
+            parts = event.content.parts if event.content and event.content.parts else []
+            text = "".join(part.text for part in parts if part.text and not part.thought)
+            if not text:
+                continue
+            if event.partial:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                yield sse("token", {"agent": event.author, "text": text})
+            else:
+                # The aggregated final event repeats the streamed chunks; only a response that was not
+                # streamed (e.g. a callback answering without the model) still needs sending as tokens
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                    yield sse("token", {"agent": event.author, "text": text})
+                final_text.append(text)
+    except Exception as e:
+        logging.exception("Agent run failed")
+        yield sse("error", {"message": str(e)})
+        return
+
+    total_ms = (time.perf_counter() - start) * 1000
+    yield sse("done", {"text": "\n".join(final_text),
+                       "ttftMs": round(first_token_ms, 1) if first_token_ms is not None else None,
+                       "totalMs": round(total_ms, 1)})
+
+
+def create_app(agents: Dict[str, object], session_service: Optional[BaseSessionService] = None) -> FastAPI:
+    """FastAPI app with one streaming endpoint per agent: POST /apps/{app_name}/stream."""
+    session_service = session_service or InMemorySessionService()
+    runners = {
+        name: Runner(app_name=name, agent=agent, session_service=session_service)
+        for name, agent in agents.items()
+    }
+    app = FastAPI(title="Agent SSE server")
+
+    @app.get("/apps")
+    async def list_apps() -> List[str]:
+        return list(runners)
+
+    @app.get("/health")
+    async def health() -> Dict:
+        return {"status": "ok", "pid": os.getpid()}
+
+    @app.post("/apps/{app_name}/stream")
+    async def stream(app_name: str, request: StreamRequest):
+        if app_name not in runners:
+            raise HTTPException(status_code=404, detail=f"Unknown app '{app_name}'")
+        session_id = request.session_id or uuid.uuid4().hex
+        session = await session_service.get_session(app_name=app_name, user_id=request.user_id,
+                                                    session_id=session_id)
+        if session is None:
+            if request.session_id and not request.create_session:
+                # E.g. an in-memory session lost when its worker was recycled
+                raise HTTPException(status_code=404, detail=f"Unknown session '{session_id}'. "
+                                                            f"Omit session_id to start a new session.")
+            await session_service.create_session(app_name=app_name, user_id=request.user_id,
+                                                 session_id=session_id)
+        return StreamingResponse(
+            stream_run(runners[app_name], request.user_id, session_id, request.message),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+def load_agents(packages: List[str]) -> Dict[str, object]:
+    agents = {}
+    for package in packages:
+        agents[package] = importlib.import_module(f"{package}.agent").root_agent
+        logging.info(f"Loaded root_agent from {package}")
+    return agents
+
+
+async def measure(url: str, app_name: str, questions: List[str], user_id: str = "bench") -> List[Dict]:
+    """Send each question in one session and time the first byte, first token and end of the stream."""
+    session_id = uuid.uuid4().hex
+    results = []
+    async with httpx.AsyncClient(timeout=None) as client:
+        for number, question in enumerate(questions):
+            start = time.perf_counter()
+            ttfb = ttft = None
+            event_name = None
+            async with client.stream("POST", f"{url}/apps/{app_name}/stream",
+                                     json={"user_id": user_id, "session_id": session_id, "message": question,
+                                           "create_session": number == 0}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    now = (time.perf_counter() - start) * 1000
+                    if ttfb is None:
+                        ttfb = now
+                    if line.startswith("event: "):
+                        event_name = line[len("event: "):]
+                    elif line.startswith("data: ") and event_name == "token" and ttft is None:
+                        ttft = now
+                    elif line.startswith("data: ") and event_name == "error":
+                        logging.error(f"{question!r}: {json.loads(line[len('data: '):])['message']}")
+            results.append({"question": question, "ttfbMs": round(ttfb, 1),
+                            "ttftMs": round(ttft, 1) if ttft is not None else None,
+                            "totalMs": round((time.perf_counter() - start) * 1000, 1)})
+    return results
+
+
+def print_measurements(results: List[Dict]) -> None:
+    print(f"{'question':<50}{'ttfb ms':>10}{'ttft ms':>10}{'total ms':>10}")
+    for row in results:
+        print(f"{row['question'][:48]:<50}{row['ttfbMs']:>10}{str(row['ttftMs']):>10}{row['totalMs']:>10}")
+    ttfts = [row["ttftMs"] for row in results if row["ttftMs"] is not None]
+    print(f"median ttfb {statistics.median(row['ttfbMs'] for row in results):.1f} ms, "
+          f"median ttft {statistics.median(ttfts) if ttfts else float('nan'):.1f} ms, "
+          f"median total {statistics.median(row['totalMs'] for row in results):.1f} ms")
+
+
+def main():
+    """Serve the agents over SSE, or measure a running server."""
+    parser = argparse.ArgumentParser(description="Stream agent output over server-sent events.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the SSE server")
+    serve.add_argument("--agents", nargs="+", default=DEFAULT_AGENTS, help="agent packages with a root_agent")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    bench = commands.add_parser("measure", help="time first byte / first token / total against a running server")
+    bench.add_argument("app_name")
+    bench.add_argument("questions", nargs="+")
+    bench.add_argument("--url", default="http://127.0.0.1:8080")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        uvicorn.run(create_app(load_agents(args.agents)), host=args.host, port=args.port)
+    else:
+        try:
+            print_measurements(asyncio.run(measure(args.url, args.app_name, args.questions)))
+        except httpx.HTTPError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+MCP Toolbox tools loaded on first use.
+
+ToolboxSyncClient starts its event loop thread when it is created, so an agent module that creates
+the client and calls load_toolset() at import time runs a thread from then on. A process with
+running threads cannot be forked safely, which keeps such agents from being built once in the
+worker pool's parent and shared copy-on-write (see worker_pool.py).
+
+ToolboxToolset is an ADK toolset that creates the client and loads the tools the first time the
+agent asks for its tools, i.e. in the process that serves requests. Importing and building the
+agent starts no thread. wrap post-processes the loaded tools (facility resolution, parallel_tools)
+and load() returns the final callables, for callbacks that call the tools directly.
+
+Usage:
+    toolset = ToolboxToolset("http://127.0.0.1:5001", wrap=parallel_tools)
+    root_agent = Agent(..., tools=[toolset, history_compactor.recall_tool_result])
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolboxToolset(BaseToolset):
+    """Toolbox tools, loaded through ToolboxSyncClient the first time they are needed."""
+
+    def __init__(self, url: str, toolset_name: Optional[str] = None,
+                 wrap: Optional[Callable[[List[Callable]], List[Callable]]] = None):
+        super().__init__()
+        self.url = url
+        self.toolset_name = toolset_name
+        self.wrap = wrap
+        self.client = None
+        self._lock = threading.Lock()
+        self._functions: Optional[List[Callable]] = None
+        self._tools: Optional[List[BaseTool]] = None
+
+    def load(self) -> List[Callable]:
+        """Create the client and load the tools once; returns the wrapped callables."""
+        with self._lock:
+            if self._functions is None:
+                from toolbox_core import ToolboxSyncClient
+                self.client = ToolboxSyncClient(self.url)
+                functions = self.client.load_toolset(self.toolset_name)
+                self._functions = self.wrap(functions) if self.wrap else functions
+                self._tools = [FunctionTool(function) for function in self._functions]
+                logger.info(f"Loaded {len(self._functions)} tools from {self.url}")
+            return self._functions
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        if self._tools is None:
+            # Loading is a blocking HTTP round trip; keep it off the event loop
+            await asyncio.to_thread(self.load)
+        return self._tools
+
+    async def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
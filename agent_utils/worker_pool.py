@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed multi-process serving runtime for the root agents.
+
+The parent imports google.adk / google.genai / toolbox_core and builds the root_agent of every
+agent package that is safe to fork, then forks a zygote process that holds the warmed interpreter. Workers are forked from the zygote,
+so they start in milliseconds and share the warmed memory copy-on-write (gc.freeze() keeps the
+collector from touching the shared pages). Each worker runs the SSE app from sse_server on its own
+port; the parent is a dispatcher that routes every session to the same worker (crc32 of the
+session id), checks the workers' /health, respawns dead or unresponsive workers, and recycles a
+worker after max_requests: the replacement is started first and the old worker gets SIGTERM once
+its in-flight streams have finished.
+
+Forking a process that runs threads is unsafe (a lock held by another thread stays locked in the
+child forever), so the parent must not start any. The DNM and neo4j agents load their toolbox tools
+on first use (toolbox_toolset.py), so they start no thread and are built in the parent. Agent
+packages that do start threads while they are imported (the BigQuery agent's Cloud Logging
+transport) are detected by importing them once in a throwaway interpreter. They are not imported in
+the parent: only the libraries are preloaded for them, and each worker builds their root_agent after
+the fork. The pool refuses to fork if any thread besides the main thread is running.
+
+Sessions live in each worker's memory, so recycling a worker loses the sessions routed to it; their
+next request gets 404 Unknown session. Workers are therefore only recycled (--max-requests) when
+--session-db (e.g. sqlite:///sessions.db) keeps the sessions in a database shared by the workers.
+
+Usage (from the repository root):
+    python -m agent_utils.worker_pool serve --workers 4 --port 8080 --max-requests 500 --session-db sqlite:///sessions.db
+    python -m agent_utils.worker_pool bench --agents dnm_conversations
+"""
+
+import gc
+import os
+import sys
+import time
+import uuid
+import zlib
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import importlib
+import statistics
+import subprocess
+import threading
+import multiprocessing
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from .sse_server import DEFAULT_AGENTS, create_app
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+HEALTH_FAILURES_BEFORE_RESTART = 3
+READY_TIMEOUT = 60.0
+DEFAULT_MAX_REQUESTS = 1000
+# Imported in the parent for every agent, including the ones built after the fork
+PRELOAD_MODULES = ["google.adk", "google.adk.runners", "google.genai", "toolbox_core"]
+# Exits with 3 when importing the agent package started a thread
+THREAD_PROBE = ("import sys, threading, importlib; importlib.import_module(sys.argv[1] + '.agent'); "
+                "sys.exit(3 if threading.active_count() > 1 else 0)")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@dataclass
+class Worker:
+    pid: int
+    port: int
+    spawned_at: float
+    ready_ms: Optional[float] = None
+    requests: int = 0
+    inflight: int = 0
+    health_failures: int = 0
+    retiring: bool = False
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def alive(self) -> bool:
+        try:
+            os.kill(self.pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+
+
+def starts_threads(package: str) -> bool:
+    """Import the agent package in a fresh interpreter and report whether that started a thread."""
+    probe = subprocess.run([sys.executable, "-c", THREAD_PROBE, package],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # An import error is raised again, with its traceback, when the worker builds the agent
+    return probe.returncode != 0
+
+
+class WarmState:
+    """Agents built in the parent, plus the packages each worker builds after fork."""
+
+    def __init__(self, packages: List[str]):
+        self.agents = {}
+        self.deferred = []  # packages whose import starts threads
+        for module in PRELOAD_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logging.warning(f"Could not preload {module}: {e}")
+        for package in packages:
+            if starts_threads(package):
+                self.deferred.append(package)
+                logging.info(f"{package} starts threads when imported; only its libraries are preloaded, "
+                             f"each worker builds its root_agent")
+                continue
+            start = time.perf_counter()
+            self.agents[package] = importlib.import_module(f"{package}.agent").root_agent
+            logging.info(f"Built {package} root_agent in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        running = [t.name for t in threading.enumerate() if t is not threading.main_thread()]
+        if running:
+            raise RuntimeError(f"Threads {running} are running in the parent; it cannot fork workers safely")
+
+    def after_fork(self) -> Dict[str, object]:
+        agents = dict(self.agents)
+        for package in self.deferred:
+            agents[package] = importlib.import_module(f"{package}.agent").root_agent
+        return agents
+
+
+def _run_worker(warm: WarmState, port: int, session_db: Optional[str]) -> None:
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    session_service = None
+    if session_db:
+        from google.adk.sessions import DatabaseSessionService
+        session_service = DatabaseSessionService(db_url=session_db)
+    app = create_app(warm.after_fork(), session_service)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _run_zygote(conn, warm: WarmState, session_db: Optional[str]) -> None:
+    """Fork a worker for every port received; workers are reaped automatically."""
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            command, port = conn.recv()
+        except EOFError:
+            break
+        if command == "exit":
+            break
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            try:
+                _run_worker(warm, port, session_db)
+            finally:
+                os._exit(0)
+        conn.send(pid)
+    os._exit(0)
+
+
+class WorkerPool:
+    """Spawns, health checks and recycles workers forked from a warmed zygote."""
+
+    def __init__(self, packages: List[str], size: int, max_requests: int = 0,
+                 session_db: Optional[str] = None, health_interval: float = 5.0):
+        self.size = size
+        self.max_requests = max_requests
+        self.health_interval = health_interval
+        self.workers: List[Optional[Worker]] = [None] * size
+        self.spawn_lock = threading.Lock()
+        self.recycling = set()
+        self.tasks = set()  # replacements in progress; the event loop only keeps weak references
+
+        self.warm = WarmState(packages)
+        self.packages = packages
+        # Objects that exist now are never collected in the workers, so their pages stay shared
+        gc.collect()
+        gc.freeze()
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.zygote_pid = os.fork()
+        if self.zygote_pid == 0:
+            self.conn.close()
+            _run_zygote(child_conn, self.warm, session_db)
+        child_conn.close()
+
+    def spawn(self) -> Worker:
+        port = free_port()
+        with self.spawn_lock:
+            self.conn.send(("spawn", port))
+            pid = self.conn.recv()
+        return Worker(pid=pid, port=port, spawned_at=time.perf_counter())
+
+    async def wait_ready(self, worker: Worker, client: httpx.AsyncClient) -> Worker:
+        deadline = time.perf_counter() + READY_TIMEOUT
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get(f"{worker.url}/health", timeout=1.0)).status_code == 200:
+                    worker.ready_ms = (time.perf_counter() - worker.spawned_at) * 1000
+                    return worker
+            except httpx.HTTPError:
+                pass
+            if not worker.alive():
+                break
+            await asyncio.sleep(0.02)
+        raise RuntimeError(f"Worker {worker.pid} on port {worker.port} did not become ready")
+
+    async def start(self, client: httpx.AsyncClient) -> None:
+        spawned = [self.spawn() for _ in range(self.size)]
+        self.workers = list(await asyncio.gather(*(self.wait_ready(w, client) for w in spawned)))
+        logging.info(f"{self.size} workers ready: " + ", ".join(
+            f"pid {w.pid} in {w.ready_ms:.0f} ms" for w in self.workers))
+
+    def route(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode()) % self.size
+
+    async def replace(self, slot: int, client: httpx.AsyncClient, reason: str) -> None:
+        """Start a new worker for slot, switch traffic to it, then stop the old one gracefully."""
+        if slot in self.recycling:
+            return
+        self.recycling.add(slot)
+        old = self.workers[slot]
+        try:
+            new = await self.wait_ready(self.spawn(), client)
+            self.workers[slot] = new
+            logging.info(f"Slot {slot}: worker {old.pid} -> {new.pid} ({reason}), ready in {new.ready_ms:.0f} ms")
+        except RuntimeError as e:
+            logging.error(f"Slot {slot}: replacement failed: {e}")
+            return
+        finally:
+            self.recycling.discard(slot)
+        old.retiring = True
+        while old.inflight and old.alive():
+            await asyncio.sleep(0.5)
+        self.stop_worker(old)
+
+    def _background(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Worker replacement failed: {task.exception()!r}")
+
+    def after_request(self, slot: int, worker: Worker, client: httpx.AsyncClient) -> None:
+        if self.max_requests and worker.requests >= self.max_requests and not worker.retiring \
+                and self.workers[slot] is worker:
+            self._background(self.replace(slot, client, f"recycled after {worker.requests} requests"))
+
+    async def health_loop(self, client: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for slot, worker in enumerate(self.workers):
+                if slot in self.recycling:
+                    continue
+                healthy = False
+                if worker.alive():
+                    try:
+                        healthy = (await client.get(f"{worker.url}/health", timeout=2.0)).status_code == 200
+                    except httpx.HTTPError:
+                        pass
+                worker.health_failures = 0 if healthy else worker.health_failures + 1
+                if not worker.alive() or worker.health_failures >= HEALTH_FAILURES_BEFORE_RESTART:
+                    self._background(self.replace(slot, client, "failed health checks"))
+
+    @staticmethod
+    def stop_worker(worker: Worker) -> None:
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def shutdown(self) -> None:
+        for worker in self.workers:
+            if worker:
+                self.stop_worker(worker)
+        try:
+            self.conn.send(("exit", None))
+        except (BrokenPipeError, OSError):
+            pass
+        os.waitpid(self.zygote_pid, 0)
+
+    def status(self) -> List[Dict]:
+        return [{"slot": slot, "pid": w.pid, "port": w.port, "requests": w.requests, "inflight": w.inflight,
+                 "readyMs": round(w.ready_ms, 1) if w.ready_ms else None, "healthFailures": w.health_failures}
+                for slot, w in enumerate(self.workers)]
+
+
+def create_dispatcher(pool: WorkerPool) -> FastAPI:
+    """Front app that relays each session's requests to its worker."""
+    client = httpx.AsyncClient(timeout=None)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await pool.start(client)
+        health = asyncio.create_task(pool.health_loop(client))
+        try:
+            yield
+        finally:
+            health.cancel()
+            for task in list(pool.tasks):
+                task.cancel()
+            await client.aclose()
+            pool.shutdown()
+
+    app = FastAPI(title="Agent worker pool", lifespan=lifespan)
+
+    @app.get("/pool")
+    async def pool_status() -> List[Dict]:
+        return pool.status()
+
+    @app.get("/apps")
+    async def list_apps() -> List[str]:
+        return pool.packages
+
+    @app.post("/apps/{app_name}/stream")
+    async def stream(app_name: str, request: Request):
+        if app_name not in pool.packages:
+            raise HTTPException(status_code=404, detail=f"Unknown app '{app_name}'")
+        body = await request.json()
+        # Sessions without an id get one here, so the follow-up requests land on the same worker
+        if not body.get("session_id"):
+            body["session_id"] = uuid.uuid4().hex
+            body["create_session"] = True
+        slot = pool.route(body["session_id"])
+        worker = pool.workers[slot]
+        worker.requests += 1
+        worker.inflight += 1
+
+        async def relay():
+            try:
+                async with client.stream("POST", f"{worker.url}/apps/{app_name}/stream", json=body) as response:
+                    async for chunk in response.aiter_raw():
+                        yield chunk
+            finally:
+                worker.inflight -= 1
+                pool.after_request(slot, worker, client)
+
+        return StreamingResponse(relay(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return app
+
+
+def cold_start_ms(packages: List[str]) -> float:
+    """Start a fresh interpreter, build the agents and the app, and return the elapsed time."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c",
+         "from agent_utils.sse_server import create_app, load_agents; "
+         f"create_app(load_agents({packages!r}))"],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+async def warm_spawn_ms(pool: WorkerPool, runs: int) -> List[float]:
+    async with httpx.AsyncClient() as client:
+        times = []
+        for _ in range(runs):
+            worker = await pool.wait_ready(pool.spawn(), client)
+            times.append(worker.ready_ms)
+            pool.stop_worker(worker)
+        return times
+
+
+def main():
+    """Serve the agents from a pre-warmed worker pool, or compare cold and warm worker start."""
+    parser = argparse.ArgumentParser(description="Pre-warmed multi-process agent server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the dispatcher and worker pool")
+    serve.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    serve.add_argument("--max-requests", type=int,
+                       help="recycle a worker after this many requests (0: never; default 1000 with --session-db, "
+                            "else 0, since recycling loses in-memory sessions)")
+    serve.add_argument("--session-db", help="database url for sessions shared by the workers")
+    serve.add_argument("--health-interval", type=float, default=5.0, help="seconds between health checks")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    bench = commands.add_parser("bench", help="cold process start vs. warm fork")
+    bench.add_argument("--runs", type=int, default=5)
+    for command in (serve, bench):
+        command.add_argument("--agents", nargs="+", default=DEFAULT_AGENTS, help="agent packages with a root_agent")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if args.max_requests is None:
+            args.max_requests = DEFAULT_MAX_REQUESTS if args.session_db else 0
+        elif args.max_requests and not args.session_db:
+            logging.warning(f"--max-requests {args.max_requests} without --session-db: every recycled worker "
+                            f"loses the sessions routed to it")
+        pool = WorkerPool(args.agents, args.workers, args.max_requests, args.session_db, args.health_interval)
+        uvicorn.run(create_dispatcher(pool), host=args.host, port=args.port)
+        return
+
+    cold = [cold_start_ms(args.agents) for _ in range(args.runs)]
+    pool = WorkerPool(args.agents, size=0)
+    try:
+        warm = asyncio.run(warm_spawn_ms(pool, args.runs))
+    finally:
+        pool.shutdown()
+    print(f"cold start (new interpreter, imports, agent build): median {statistics.median(cold):.0f} ms, "
+          f"max {max(cold):.0f} ms")
+    print(f"warm fork (fork, build of thread-starting agents, ready): median {statistics.median(warm):.0f} ms, "
+          f"max {max(warm):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ from google.adk import Agent
 from google.adk.agents import SequentialAgent
 from google.adk.tools.tool_context import ToolContext
 
+from agent_utils.prompt_cache import prompt_cache_from_env
+
 
 try:
     from .bq_utils.bq_tools import get_bigquery_toolset, get_latest_order_from_bigquery, update_order_status_in_bigquery
@@ -46,6 +48,9 @@ model_name = os.getenv("MODEL", "gemini-2.5-flash")
 
 logging.info(f"Using model: {model_name}")
 
+# The sub-agent instructions and the BigQuery tool declarations are static; send them as a context cache
+prompt_cache = prompt_cache_from_env()
+
 
 def get_latest_order(tool_context: ToolContext) -> dict:
     """
@@ -131,6 +136,9 @@ store_database_agent = Agent(
     Make sure to handle any database connection errors gracefully and always save order details to the state.
     """,
     tools=store_database_agent_tools,
+    before_model_callback=prompt_cache,
+    after_model_callback=prompt_cache.after_model,
+    on_model_error_callback=prompt_cache.on_model_error,
 )
 
 ## Process order Agent
@@ -162,6 +170,9 @@ process_order_agent = Agent(
     **Note**: All necessary information (order_details, delivery_month) will be available in the agent state from previous steps.
     """,
     tools=process_order_agent_tools,
+    before_model_callback=prompt_cache,
+    after_model_callback=prompt_cache.after_model,
+    on_model_error_callback=prompt_cache.on_model_error,
 )
 
 
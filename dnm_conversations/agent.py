@@ -1,28 +1,93 @@
+import os
+import logging
+
 from google.adk import Agent
 from google.adk.apps import App
-from toolbox_core import ToolboxSyncClient
 
-client = ToolboxSyncClient("http://127.0.0.1:5001")
+from agent_utils.history_compaction import HistoryCompactor
+from agent_utils.prompt_cache import prompt_cache_from_env
+from agent_utils.parallel_tools import parallel_tools
+from agent_utils.toolbox_toolset import ToolboxToolset
+from .dnm_utils.facility_resolver import FacilityResolver, resolving_facilities
+from .dnm_utils.intent_router import IntentRouter
+
+try:
+    from .dnm_utils.dwell_analytics import ANALYTICS_TOOLS
+    ANALYTICS_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Dwell analytics not available: {e}")
+    ANALYTICS_TOOLS = []
+    ANALYTICS_AVAILABLE = False
+
+# Resolves facility names / ids / partial names in tool arguments, loaded from the graph on first use
+TOOLS_FILE = os.path.join(os.path.dirname(__file__), "tools.yaml")
+facility_resolver = FacilityResolver.from_tools_file(TOOLS_FILE, "dnm-graph")
+
+# Facility parameters of each tool that the resolver fills in
+FACILITY_PARAMS = {
+    "get_articles_dwelling_at_facility": ["facilityId"],
+    "get_intransit_articles_to_facility": ["facilityId"],
+    "count_articles_at_facility": ["facilityId"],
+    "facility_dwell_stats": ["facility_id"],
+    "lane_transit_stats": ["from_facility_id", "to_facility_id"],
+    "dwell_trend": ["facility_id"],
+}
+
+
+def prepare_tools(toolbox_tools):
+    """Resolve facility arguments, and run the tool calls of one model turn (e.g. every CRITICAL facility)
+    concurrently instead of one by one."""
+    dnm_tools = [
+        resolving_facilities(tool, facility_resolver, FACILITY_PARAMS[tool.__name__])
+        if tool.__name__ in FACILITY_PARAMS else tool
+        for tool in toolbox_tools + ANALYTICS_TOOLS
+    ]
+    return parallel_tools(dnm_tools, max_concurrency=10, timeout=30.0)
+
+
+# Loaded on first use, so importing this module starts no toolbox client thread (safe to fork)
+dnm_toolset = ToolboxToolset("http://127.0.0.1:5001", wrap=prepare_tools)
+
+# Answers the most common questions without a model planning turn (awaits the tools directly)
+intent_router = IntentRouter(dnm_toolset.load)
+
+# Shortens stale tool results (article lists, journey tables) in the history sent to the model
+history_compactor = HistoryCompactor(token_budget=4000, keep_recent_turns=2)
+
+# Sends the static instruction and tool declarations as a context cache (PROMPT_CACHE=gemini|local|off)
+prompt_cache = prompt_cache_from_env()
 
 root_agent = Agent(
     name='root_agent',
     model='gemini-2.5-flash',
-    instruction="""
+    instruction=f"""
     You are a logistics assistant. 
     1. For general shipment questions, help the user normally.
     2. For status-specific searches, you MUST map natural language to codes:
        - 'delivered' -> 'D'
        - 'moving' or 'in transit' -> 'T'
        - 'at facility' or 'warehouse' -> 'F'
-    3. Use 'check_network_congestion' to find facilities that are overcrowded or acting as bottlenecks. 
+    3. Tools that take a facility accept its id, name or a partial name (e.g. 'FAC1', 'Facility 1', 'fac 1 vic') directly.
+       - Do not call 'facilities' to look up a facility before calling them.
+       - If a tool reports that several facilities match, ask the user which one they mean.
+    4. Use 'check_network_congestion' to find facilities that are overcrowded or acting as bottlenecks. 
        - If a user asks 'Is the network busy?', run this tool with a default threshold.
         - Suggest checking the articles at the facility using  'get_articles_dwelling_at_facility'. 
-    4. Use 'get_longest_open_journeys' to find delayed items.
+       - When you need the same details for several facilities (e.g. every CRITICAL facility), request all of those tool calls in the same turn; they run in parallel.
+    5. Use 'get_longest_open_journeys' to find delayed items.
        - Note: The 'duration' returned is in  Minutes. 
        - Always report the specific duration to the user so they understand the severity of the delay.
-    5. If the user asks for something outside logistics (like weather or jokes), 
+    6. {"For dwell time and transit time statistics (worst facilities, percentiles, lanes, trends per state), use the analytics tools 'worst_dwell_facilities', 'facility_dwell_stats', 'state_dwell_rollup', 'lane_transit_stats' and 'dwell_trend'. They answer from a periodic snapshot, so mention the snapshot time." if ANALYTICS_AVAILABLE else "Dwell and transit time statistics are not available."}
+    7. List tools return one page at a time. 
+       - For counts or overviews use 'summarize_articles_by_status' instead of listing articles.
+       - Only fetch the next page (pass the last id as 'after_id') when the user asks for more.
+       - Older tool results may be shortened to a summary with a 'ref'. Call 'recall_tool_result' with that ref only if you need the full result again.
+    8. If the user asks for something outside logistics (like weather or jokes), 
        kindly refocus them on the logistics operations.
     """,    
-    tools=client.load_toolset(),
+    tools=[dnm_toolset, history_compactor.recall_tool_result],
+    before_model_callback=[intent_router, history_compactor, prompt_cache],
+    after_model_callback=prompt_cache.after_model,
+    on_model_error_callback=prompt_cache.on_model_error,
 )
 
@@ -2,6 +2,11 @@ CREATE CONSTRAINT FOR (s:State) REQUIRE s.stateId IS UNIQUE;
 CREATE CONSTRAINT FOR (f:Facility) REQUIRE f.facilityId IS UNIQUE;
 CREATE CONSTRAINT FOR (a:Article) REQUIRE a.articleId IS UNIQUE;
 CREATE CONSTRAINT FOR (v:ArticleVisit) REQUIRE v.visitId IS UNIQUE;
+CREATE INDEX journey_id IF NOT EXISTS FOR (j:Journey) ON (j.journeyId);
+CREATE INDEX open_journey_time IF NOT EXISTS FOR (j:OpenJourney) ON (j.journeyTime);
+CREATE INDEX journey_articlestatus IF NOT EXISTS FOR (j:Journey) ON (j.articleStatus);
+CREATE INDEX articlevisit_facilityid IF NOT EXISTS FOR (v:ArticleVisit) ON (v.facilityId);
+CREATE INDEX container_tofacilityid IF NOT EXISTS FOR (c:Container) ON (c.toFacilityId);
 
 // 1. Create States
 UNWIND [
@@ -333,6 +338,28 @@ WITH j , f1, fn
 set 
 j.journeyTime = duration.inSeconds(f1.entryDate ,fn.lastScan ).minutes ; 
 
+// Label open journeys (read by get_longest_open_journeys through the open_journey_time index)
+
+MATCH (j:Journey)
+WHERE j.articleStatus IN ['T', 'F']
+SET j:OpenJourney;
+
+// Facility load counters (read by check_network_congestion)
+// Rebuild / check with: python -m dnm_conversations.dnm_utils.facility_load rebuild|check
+
+MATCH (f:Facility)
+SET f.dwellingCount = 0, f.inboundCount = 0, f.loadUpdatedAt = datetime();
+
+MATCH (:Journey {articleStatus: 'F'})-[:LAST_FACILITY_VISIT]->(av:ArticleVisit)
+WITH av.facilityId AS facilityId, count(*) AS load
+MATCH (f:Facility {facilityId: facilityId})
+SET f.dwellingCount = load;
+
+MATCH (:Journey {articleStatus: 'T'})-[:LAST_FACILITY_VISIT]->()-[:TRANSPORTED_BY]->(c:Container)
+WITH c.toFacilityId AS facilityId, count(*) AS load
+MATCH (f:Facility {facilityId: facilityId})
+SET f.inboundCount = load;
+
 
 
 Refine 
@@ -0,0 +1,269 @@
+"""
+Vectorized dwell / transit analytics over a columnar DNM snapshot (see snapshot_export.py).
+
+The snapshot files are memory-mapped and their columns turned into NumPy arrays once. Grouped
+percentiles are computed with one sort per question instead of per-row Cypher, so per-facility,
+per-lane and per-state rollups over millions of visits answer in milliseconds.
+
+The functions at the bottom of this module are the agent tools.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+SNAPSHOT_DIR = os.getenv(
+    "DNM_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "snapshot"))
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+MS_PER_DAY = 86400000
+
+
+def _read_table(snapshot_dir: str, name: str) -> pa.Table:
+    arrow_path = os.path.join(snapshot_dir, f"{name}.arrow")
+    if os.path.exists(arrow_path):
+        return pa.ipc.open_file(pa.memory_map(arrow_path)).read_all()
+    return pq.read_table(os.path.join(snapshot_dir, f"{name}.parquet"), memory_map=True)
+
+
+def _codes(column: pa.ChunkedArray, dictionary: pa.Array) -> np.ndarray:
+    """Map a string column to positions in dictionary, -1 where missing or unknown."""
+    return pc.fill_null(pc.index_in(column, value_set=dictionary), -1).to_numpy().astype(np.int64)
+
+
+def _floats(column: pa.ChunkedArray) -> np.ndarray:
+    """Numeric column as float64 with NaN for nulls."""
+    return pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def grouped_percentiles(
+    groups: np.ndarray, values: np.ndarray, percentiles: Sequence[float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Percentiles of values per group, with linear interpolation like np.percentile.
+    Groups are small non-negative integer codes; rows with a negative group or a NaN value are ignored.
+    Returns (group keys, counts, means, percentiles[n_groups, len(percentiles)]).
+    """
+    valid = (groups >= 0) & ~np.isnan(values)
+    g, v = groups[valid], values[valid]
+    if not len(v):
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0), np.empty((0, len(percentiles)))
+
+    all_counts = np.bincount(g)
+    keys = np.flatnonzero(all_counts)
+    counts = all_counts[keys]
+    means = np.bincount(g, weights=v)[keys] / counts
+
+    # One sort of a combined (group, value) key is several times faster than lexsort on two columns
+    offset = v.min()
+    scale = v.max() - offset + 1
+    ordered = np.sort(g * scale + (v - offset)) - np.repeat(keys, counts) * scale + offset
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.empty((len(keys), len(percentiles)))
+    for j, p in enumerate(percentiles):
+        pos = starts + (counts - 1) * (p / 100.0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        result[:, j] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+    return keys, counts, means, result
+
+
+class DwellAnalytics:
+    """Columnar view of a DNM snapshot."""
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        with open(os.path.join(snapshot_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+
+        facilities = _read_table(snapshot_dir, "facilities")
+        self.facility_ids = facilities.column("facilityId").combine_chunks()
+        self.facility_index = {fid: i for i, fid in enumerate(self.facility_ids.to_pylist())}
+        self.facility_names = facilities.column("facilityName").to_pylist()
+        self.state_ids = pa.array(sorted({s for s in facilities.column("stateId").to_pylist() if s}))
+        self.facility_state = _codes(facilities.column("stateId"), self.state_ids)
+
+        visits = _read_table(snapshot_dir, "visits")
+        self.visit_facility = _codes(visits.column("facilityId"), self.facility_ids)
+        self.visit_next_facility = _codes(visits.column("nextFacilityId"), self.facility_ids)
+        self.visit_open = pc.is_in(visits.column("articleStatus"), value_set=pa.array(["T", "F"])).to_numpy(
+            zero_copy_only=False)
+        self.dwell = _floats(visits.column("dwellTime"))
+        self.transit = _floats(visits.column("transitTime"))
+        # Visits without an entryDate are left out of the time-based questions; 0 keeps the column int64
+        entry = visits.column("entryDate")
+        self.entry_known = pc.is_valid(entry).to_numpy(zero_copy_only=False)
+        self.entry_ms = pc.fill_null(pc.cast(entry, pa.int64()), 0).to_numpy(zero_copy_only=False)
+        logging.info(f"Loaded DNM snapshot from {snapshot_dir}: {len(self.dwell)} visits")
+
+    def facility_id(self, facility_id: str) -> int:
+        if facility_id not in self.facility_index:
+            raise LookupError(f"Unknown facility '{facility_id}'.")
+        return self.facility_index[facility_id]
+
+    def _facility_rows(self, keys, counts, means, values, percentiles) -> List[Dict]:
+        return [
+            {
+                "facilityId": self.facility_ids[int(k)].as_py(),
+                "facilityName": self.facility_names[int(k)],
+                "visits": int(n),
+                "mean": round(float(m), 1),
+                **{f"p{p:g}": round(float(x), 1) for p, x in zip(percentiles, row)},
+            }
+            for k, n, m, row in zip(keys, counts, means, values)
+        ]
+
+    def facility_dwell_percentiles(
+        self, percentiles: Sequence[float] = DEFAULT_PERCENTILES, open_only: bool = False
+    ) -> List[Dict]:
+        """Dwell time percentiles (minutes) for every facility."""
+        groups = np.where(self.visit_open, self.visit_facility, -1) if open_only else self.visit_facility
+        return self._facility_rows(*grouped_percentiles(groups, self.dwell, percentiles), percentiles)
+
+    def worst_dwell_facilities(self, top_k: int = 5, percentile: float = 90, open_only: bool = False) -> List[Dict]:
+        """The top_k facilities ranked by a dwell time percentile."""
+        rows = self.facility_dwell_percentiles((50, percentile), open_only)
+        return sorted(rows, key=lambda r: r[f"p{percentile:g}"], reverse=True)[:top_k]
+
+    def state_dwell_percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[Dict]:
+        """Dwell time percentiles per state."""
+        groups = np.where(self.visit_facility >= 0, self.facility_state[self.visit_facility], -1)
+        keys, counts, means, values = grouped_percentiles(groups, self.dwell, percentiles)
+        return [
+            {
+                "stateId": self.state_ids[int(k)].as_py(),
+                "visits": int(n),
+                "mean": round(float(m), 1),
+                **{f"p{p:g}": round(float(x), 1) for p, x in zip(percentiles, row)},
+            }
+            for k, n, m, row in zip(keys, counts, means, values)
+        ]
+
+    def lane_transit_percentiles(
+        self, from_facility_id: str, to_facility_id: Optional[str] = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> List[Dict]:
+        """Transit time percentiles for the lanes leaving a facility, or for a single lane."""
+        mask = (self.visit_facility == self.facility_id(from_facility_id)) & (self.visit_next_facility >= 0)
+        if to_facility_id:
+            mask &= self.visit_next_facility == self.facility_id(to_facility_id)
+        lanes = np.where(mask, self.visit_next_facility, -1)
+        keys, counts, means, values = grouped_percentiles(lanes, self.transit, percentiles)
+        rows = [
+            {
+                "fromFacilityId": from_facility_id,
+                "toFacilityId": self.facility_ids[int(k)].as_py(),
+                "trips": int(c),
+                "mean": round(float(m), 1),
+                **{f"p{p:g}": round(float(x), 1) for p, x in zip(percentiles, row)},
+            }
+            for k, c, m, row in zip(keys, counts, means, values)
+        ]
+        return sorted(rows, key=lambda r: r["trips"], reverse=True)
+
+    def dwell_histogram(self, facility_id: str, bins: int = 10) -> Dict:
+        """Histogram of the dwell times (minutes) at a facility."""
+        values = self.dwell[(self.visit_facility == self.facility_id(facility_id)) & ~np.isnan(self.dwell)]
+        counts, edges = np.histogram(values, bins=bins)
+        return {"binEdgesMinutes": [round(float(e), 1) for e in edges], "counts": counts.tolist()}
+
+    def dwell_trend(self, facility_id: str, window_days: int = 7, periods: int = 8) -> List[Dict]:
+        """Median and p90 dwell time at a facility over the last periods windows of window_days."""
+        mask = (self.visit_facility == self.facility_id(facility_id)) & self.entry_known
+        if not mask.any():
+            return []
+        window_ms = window_days * MS_PER_DAY
+        end = int(self.entry_ms[mask].max()) + 1
+        buckets = np.where(mask, (end - 1 - self.entry_ms) // window_ms, -1)
+        buckets = np.where(buckets < periods, buckets, -1)
+        keys, counts, _, values = grouped_percentiles(buckets, self.dwell, (50, 90))
+        rows = [
+            {
+                "windowStart": str(np.datetime64(end - (int(k) + 1) * window_ms, "ms").astype("datetime64[s]")),
+                "visits": int(c),
+                "p50": round(float(row[0]), 1),
+                "p90": round(float(row[1]), 1),
+            }
+            for k, c, row in zip(keys, counts, values)
+        ]
+        return sorted(rows, key=lambda r: r["windowStart"])
+
+
+_analytics: Optional[DwellAnalytics] = None
+_analytics_mtime: Optional[float] = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics(snapshot_dir: str = SNAPSHOT_DIR) -> DwellAnalytics:
+    """Return the loaded snapshot, reloading it when a newer snapshot has been exported."""
+    global _analytics, _analytics_mtime
+    mtime = os.path.getmtime(os.path.join(snapshot_dir, "manifest.json"))
+    with _analytics_lock:
+        if _analytics is None or mtime != _analytics_mtime:
+            _analytics = DwellAnalytics(snapshot_dir)
+            _analytics_mtime = mtime
+        return _analytics
+
+
+def _run(fn) -> Dict:
+    try:
+        analytics = get_analytics()
+        return {"status": "success", "snapshotCreatedAt": analytics.manifest["createdAt"], **fn(analytics)}
+    except FileNotFoundError:
+        return {"status": "error", "message": "No analytics snapshot found. Run snapshot_export first."}
+    except LookupError as e:
+        return {"status": "error", "message": e.args[0] if e.args else str(e)}
+
+
+# --- Agent tools ---
+
+def worst_dwell_facilities(top_k: int = 5, percentile: float = 90, open_only: bool = False) -> dict:
+    """
+    Ranks facilities by their dwell time (minutes an article stays at a facility) percentile.
+    Use this for questions like 'which facilities have the worst dwell times'.
+    Set open_only to only consider undelivered articles. Based on the latest analytics snapshot.
+    """
+    return _run(lambda a: {"facilities": a.worst_dwell_facilities(top_k, percentile, open_only)})
+
+
+def facility_dwell_stats(facility_id: str) -> dict:
+    """
+    Dwell time statistics in minutes (visits, mean, p50, p90, p99 and a histogram) for one facility,
+    given its facilityId (e.g. FAC1). Based on the latest analytics snapshot.
+    """
+    def stats(a: DwellAnalytics) -> Dict:
+        index = a.facility_id(facility_id)
+        row = next(r for r in a.facility_dwell_percentiles() if r["facilityId"] == a.facility_ids[index].as_py())
+        return {"dwell": row, "histogram": a.dwell_histogram(facility_id)}
+    return _run(stats)
+
+
+def state_dwell_rollup() -> dict:
+    """Dwell time percentiles in minutes per state. Based on the latest analytics snapshot."""
+    return _run(lambda a: {"states": a.state_dwell_percentiles()})
+
+
+def lane_transit_stats(from_facility_id: str, to_facility_id: str = "") -> dict:
+    """
+    Transit time percentiles in minutes between facilities (a lane), given facilityIds (e.g. FAC1).
+    Leave to_facility_id empty to get every lane leaving from_facility_id. Based on the latest analytics snapshot.
+    """
+    return _run(lambda a: {"lanes": a.lane_transit_percentiles(from_facility_id, to_facility_id or None)})
+
+
+def dwell_trend(facility_id: str, window_days: int = 7, periods: int = 8) -> dict:
+    """
+    Trend of the median and p90 dwell time in minutes at a facility, given its facilityId (e.g. FAC1),
+    over the last periods windows of window_days. Based on the latest analytics snapshot.
+    """
+    return _run(lambda a: {"trend": a.dwell_trend(facility_id, window_days, periods)})
+
+
+ANALYTICS_TOOLS = [worst_dwell_facilities, facility_dwell_stats, state_dwell_rollup, lane_transit_stats, dwell_trend]
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Materialized per-facility load counters for the DNM graph.
+
+Every Facility node carries two counters that check_network_congestion reads directly:
+- dwellingCount: undelivered articles ('F' journeys) whose last visit is at the facility.
+- inboundCount: articles in transit ('T' journeys) on a container heading to the facility.
+
+Writers that change a journey status or its last visit keep the counters up to date by
+calling apply_load_deltas() in the same transaction. This script rebuilds the counters
+from scratch (backfill) and checks them against the graph.
+
+Usage (from the repository root):
+    python -m dnm_conversations.dnm_utils.facility_load rebuild
+    python -m dnm_conversations.dnm_utils.facility_load check
+"""
+
+import sys
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from toolbox_utils.neo4j_source import get_driver
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLS_FILE = "dnm_conversations/tools.yaml"
+
+# Journey status codes that contribute to a facility load
+DWELLING_STATUS = "F"
+IN_TRANSIT_STATUS = "T"
+
+ACTUAL_DWELLING_QUERY = """
+MATCH (:Journey {articleStatus: 'F'})-[:LAST_FACILITY_VISIT]->(av:ArticleVisit)
+RETURN av.facilityId AS facilityId, count(*) AS load
+"""
+
+ACTUAL_INBOUND_QUERY = """
+MATCH (:Journey {articleStatus: 'T'})-[:LAST_FACILITY_VISIT]->()-[:TRANSPORTED_BY]->(c:Container)
+RETURN c.toFacilityId AS facilityId, count(*) AS load
+"""
+
+STORED_LOAD_QUERY = """
+MATCH (f:Facility)
+RETURN f.facilityId AS facilityId, f.dwellingCount AS dwelling, f.inboundCount AS inbound
+"""
+
+SET_LOAD_STATEMENT = """
+UNWIND $rows AS row
+MATCH (f:Facility {facilityId: row.facilityId})
+SET f.dwellingCount = row.dwelling,
+    f.inboundCount = row.inbound,
+    f.loadUpdatedAt = datetime()
+"""
+
+APPLY_LOAD_DELTAS_STATEMENT = """
+UNWIND $deltas AS d
+MATCH (f:Facility {facilityId: d.facilityId})
+SET f.dwellingCount = coalesce(f.dwellingCount, 0) + d.dwelling,
+    f.inboundCount = coalesce(f.inboundCount, 0) + d.inbound,
+    f.loadUpdatedAt = datetime()
+"""
+
+
+def load_contribution(
+    status: Optional[str],
+    last_facility_id: Optional[str],
+    inbound_facility_id: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the (dwelling facility, inbound facility) a journey counts towards.
+    A journey at a facility counts towards its last visit, a journey in transit
+    towards the destination of its container. Delivered journeys count nowhere.
+    """
+    if status == DWELLING_STATUS:
+        return last_facility_id, None
+    if status == IN_TRANSIT_STATUS:
+        return None, inbound_facility_id
+    return None, None
+
+
+def load_deltas(changes: List[Dict]) -> List[Dict]:
+    """
+    Turn journey changes into counter deltas.
+
+    Each change is a dict with the journey state before and after the update:
+    oldStatus, oldFacilityId, oldInboundFacilityId, newStatus, newFacilityId, newInboundFacilityId.
+    Returns one {facilityId, dwelling, inbound} row per facility with a non-zero delta.
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for change in changes:
+        old_dwelling, old_inbound = load_contribution(
+            change.get("oldStatus"), change.get("oldFacilityId"), change.get("oldInboundFacilityId"))
+        new_dwelling, new_inbound = load_contribution(
+            change.get("newStatus"), change.get("newFacilityId"), change.get("newInboundFacilityId"))
+        if old_dwelling:
+            totals[old_dwelling][0] -= 1
+        if new_dwelling:
+            totals[new_dwelling][0] += 1
+        if old_inbound:
+            totals[old_inbound][1] -= 1
+        if new_inbound:
+            totals[new_inbound][1] += 1
+
+    return [
+        {"facilityId": facility_id, "dwelling": dwelling, "inbound": inbound}
+        for facility_id, (dwelling, inbound) in totals.items()
+        if dwelling or inbound
+    ]
+
+
+def apply_load_deltas(tx, changes: List[Dict]) -> int:
+    """
+    Apply the counter deltas for a list of journey changes inside an open transaction.
+    Returns the number of facilities updated.
+    """
+    deltas = load_deltas(changes)
+    if deltas:
+        tx.run(APPLY_LOAD_DELTAS_STATEMENT, deltas=deltas).consume()
+    return len(deltas)
+
+
+def compute_actual_load(session) -> Dict[str, Dict[str, int]]:
+    """Aggregate the current facility load from the journeys in the graph."""
+    load = defaultdict(lambda: {"dwelling": 0, "inbound": 0})
+    for record in session.run(ACTUAL_DWELLING_QUERY):
+        load[record["facilityId"]]["dwelling"] = record["load"]
+    for record in session.run(ACTUAL_INBOUND_QUERY):
+        load[record["facilityId"]]["inbound"] = record["load"]
+    return load
+
+
+def rebuild(session) -> int:
+    """
+    Recompute every facility counter from the journeys in the graph.
+    Pause ingestion while this runs, otherwise concurrent deltas can be overwritten.
+    """
+    actual = compute_actual_load(session)
+    facility_ids = [record["facilityId"] for record in session.run(STORED_LOAD_QUERY)]
+    rows = [
+        {"facilityId": facility_id, **actual.get(facility_id, {"dwelling": 0, "inbound": 0})}
+        for facility_id in facility_ids
+    ]
+    session.run(SET_LOAD_STATEMENT, rows=rows).consume()
+    logging.info(f"Rebuilt load counters for {len(rows)} facilities")
+    return len(rows)
+
+
+def check(session) -> List[Dict]:
+    """Compare the stored counters with the graph. Returns the facilities that drifted."""
+    actual = compute_actual_load(session)
+    mismatches = []
+    for record in session.run(STORED_LOAD_QUERY):
+        expected = actual.get(record["facilityId"], {"dwelling": 0, "inbound": 0})
+        if record["dwelling"] != expected["dwelling"] or record["inbound"] != expected["inbound"]:
+            mismatches.append({
+                "facilityId": record["facilityId"],
+                "storedDwelling": record["dwelling"],
+                "actualDwelling": expected["dwelling"],
+                "storedInbound": record["inbound"],
+                "actualInbound": expected["inbound"],
+            })
+    return mismatches
+
+
+def main():
+    """Rebuild or check the facility load counters."""
+    parser = argparse.ArgumentParser(description="Maintain the materialized facility load counters.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--tools-file", default=TOOLS_FILE, help="toolbox tools.yaml with the dnm-graph source")
+    parser.add_argument("--source", default="dnm-graph", help="Neo4j source name in the tools file")
+    args = parser.parse_args()
+
+    driver, database = get_driver(args.tools_file, args.source)
+    try:
+        with driver.session(database=database) as session:
+            if args.command == "rebuild":
+                rebuild(session)
+                return
+
+            mismatches = check(session)
+            if not mismatches:
+                print("Facility load counters are consistent.")
+                return
+            print(f"{len(mismatches)} facilities have inconsistent load counters:")
+            for row in mismatches:
+                print(
+                    f"  {row['facilityId']}: dwelling {row['storedDwelling']} (actual {row['actualDwelling']}), "
+                    f"inbound {row['storedInbound']} (actual {row['actualInbound']})"
+                )
+            sys.exit(1)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
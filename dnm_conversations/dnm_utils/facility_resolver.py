@@ -0,0 +1,249 @@
+"""
+In-memory facility resolver for the DNM tools.
+
+Users name facilities in many ways ('Facility 1 (VIC)', 'facility 1', 'FAC1', 'fac 1 vic', 'facilty 12'),
+while the graph keys visits and containers by facilityId. The resolver loads every facility once,
+indexes ids, names and states (exact keys, a sorted prefix list and trigrams), and maps user input
+to the canonical facilityId without a round trip through the 'facilities' tool.
+
+A trailing state ('fac 1 nsw', 'Facility 1 (NSW)') restricts the match to that state, so a
+facility in another state is reported instead of silently returned.
+
+Every refresh_interval the catalog is read again (a few hundred rows) and the indexes are rebuilt
+only if it changed, so added, removed and renamed facilities are picked up without any marker property.
+If the catalog cannot be read (the database is down, wrong credentials), the last catalog is kept;
+before the first successful load, wrapped tools get the user's value unchanged.
+"""
+
+import re
+import time
+import bisect
+import inspect
+import logging
+import functools
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from neo4j.exceptions import DriverError, Neo4jError
+    CATALOG_ERRORS = (DriverError, Neo4jError, OSError)
+except ImportError:
+    CATALOG_ERRORS = (OSError,)
+
+CATALOG_QUERY = """
+MATCH (f:Facility)
+OPTIONAL MATCH (f)-[:BELONGS_TO]->(s:State)
+RETURN f.facilityId AS facilityId, f.facilityName AS facilityName, s.stateId AS stateId, s.stateName AS stateName
+ORDER BY f.facilityId
+"""
+
+MIN_FUZZY_SCORE = 0.35
+MAX_CANDIDATES = 10
+
+
+def normalize(text: str) -> str:
+    """Lowercase, split letters from digits and drop punctuation: 'FAC1 (VIC)' -> 'fac 1 vic'."""
+    text = re.sub(r"(?<=[a-zA-Z])(?=\d)|(?<=\d)(?=[a-zA-Z])", " ", text.lower())
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FacilityResolver:
+    """Resolves free-text facility references to facilityIds."""
+
+    def __init__(
+        self,
+        load_catalog: Callable[[], List[Dict]],
+        load_version: Optional[Callable[[], Tuple]] = None,
+        refresh_interval: float = 60.0,
+    ):
+        self._load_catalog = load_catalog
+        self._load_version = load_version
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._catalog = None
+        self._checked_at = 0.0
+        self.facilities: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_driver(cls, driver, database: str, refresh_interval: float = 60.0) -> "FacilityResolver":
+        """Build a resolver that loads the catalog through a Neo4j driver."""
+        def load_catalog():
+            with driver.session(database=database) as session:
+                return [record.data() for record in session.run(CATALOG_QUERY)]
+
+        return cls(load_catalog, refresh_interval=refresh_interval)
+
+    @classmethod
+    def from_tools_file(cls, tools_file: str, source_name: Optional[str] = None,
+                        refresh_interval: float = 60.0) -> "FacilityResolver":
+        """Build a resolver for a toolbox Neo4j source; the driver is only created on the first resolve."""
+        connection = {}
+
+        def load_catalog():
+            if not connection:
+                from toolbox_utils.neo4j_source import get_driver
+                connection["driver"], connection["database"] = get_driver(tools_file, source_name)
+            with connection["driver"].session(database=connection["database"]) as session:
+                return [record.data() for record in session.run(CATALOG_QUERY)]
+
+        return cls(load_catalog, refresh_interval=refresh_interval)
+
+    def _build(self, catalog: List[Dict]) -> None:
+        facilities, exact, states = {}, {}, defaultdict(list)
+        grams = defaultdict(set)
+        for row in catalog:
+            facility_id = row["facilityId"]
+            facilities[facility_id] = row
+            name = normalize(row.get("facilityName") or "")
+            # 'facility 1 vic' -> also 'facility 1'
+            short_name = re.sub(r"\s+[a-z]+$", "", name) if row.get("stateId") else name
+            keys = {normalize(facility_id), name, short_name}
+            for key in filter(None, keys):
+                exact.setdefault(key, facility_id)
+                for gram in trigrams(key):
+                    grams[gram].add(key)
+            for state_key in filter(None, (row.get("stateId"), row.get("stateName"))):
+                states[normalize(state_key)].append(facility_id)
+
+        self.facilities = facilities
+        self._exact = exact
+        self._prefix_keys = sorted(exact)
+        self._trigrams = grams
+        self._key_gram_counts = {key: len(trigrams(key)) for key in exact}
+        self._states = dict(states)
+        logging.info(f"Facility resolver loaded {len(facilities)} facilities")
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the catalog if it was never loaded, or its version changed since the last check."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self.facilities and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            try:
+                if self._load_version is None:
+                    # No cheap version available: compare the catalog itself
+                    catalog = self._load_catalog()
+                    if force or catalog != self._catalog:
+                        self._build(catalog)
+                        self._catalog = catalog
+                    return
+                version = self._load_version()
+                if force or not self.facilities or version != self._version:
+                    self._build(self._load_catalog())
+                    self._version = version
+            except CATALOG_ERRORS as e:
+                if not self.facilities:
+                    raise
+                logging.warning(f"Could not reload the facility catalog, keeping the last one: {e}")
+
+    def _match(self, key: str) -> Tuple[str, List[str]]:
+        if key in self._exact:
+            return "exact", [self._exact[key]]
+
+        start = bisect.bisect_left(self._prefix_keys, key)
+        prefixed = []
+        for candidate in self._prefix_keys[start:]:
+            if not candidate.startswith(key):
+                break
+            if self._exact[candidate] not in prefixed:
+                prefixed.append(self._exact[candidate])
+        if prefixed:
+            return "prefix", prefixed
+
+        # Jaccard similarity of trigram sets, counting shared trigrams through the inverted index
+        grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate_key in self._trigrams.get(gram, ()):
+                shared[candidate_key] += 1
+        scores = defaultdict(float)
+        for candidate_key, common in shared.items():
+            score = common / (len(grams) + self._key_gram_counts[candidate_key] - common)
+            facility_id = self._exact[candidate_key]
+            scores[facility_id] = max(scores[facility_id], score)
+        ranked = sorted((s, f) for f, s in scores.items() if s >= MIN_FUZZY_SCORE)[::-1]
+        if not ranked:
+            return "none", []
+        best = ranked[0][0]
+        return "fuzzy", [f for s, f in ranked if s == best]
+
+    def _split_state(self, key: str) -> Tuple[str, Optional[str]]:
+        """'facility 1 nsw' -> ('facility 1', 'nsw') when the trailing words name a state."""
+        words = key.split()
+        for size in (3, 2, 1):
+            if len(words) > size and " ".join(words[-size:]) in self._states:
+                return " ".join(words[:-size]), " ".join(words[-size:])
+        return key, None
+
+    def resolve(self, text: str) -> Dict:
+        """
+        Return the facility matching text, with how it matched.
+        Raises LookupError when nothing or more than one facility matches; the message lists the candidates.
+        """
+        self.refresh()
+        key = normalize(text)
+        if key in self._states:
+            matches, how = self._states[key], "state"
+        elif key in self._exact:
+            how, matches = self._match(key)
+        else:
+            base, state = self._split_state(key)
+            how, matches = self._match(base)
+            if state is not None:
+                in_state = [f for f in matches if f in self._states[state]]
+                if matches and not in_state:
+                    found = ", ".join(f"{f} ({self.facilities[f]['facilityName']})" for f in matches[:MAX_CANDIDATES])
+                    state_id = self.facilities[self._states[state][0]].get("stateId") or state
+                    raise LookupError(f"No facility matching '{text}' in {state_id}; "
+                                      f"'{base}' matches {found} in another state. Ask the user which one they mean.")
+                matches = in_state
+        if len(matches) == 1:
+            return {**self.facilities[matches[0]], "match": how}
+        if not matches:
+            raise LookupError(f"No facility matches '{text}'.")
+        names = ", ".join(f"{f} ({self.facilities[f]['facilityName']})" for f in matches[:MAX_CANDIDATES])
+        more = f" and {len(matches) - MAX_CANDIDATES} more" if len(matches) > MAX_CANDIDATES else ""
+        raise LookupError(f"'{text}' matches several facilities: {names}{more}. Ask the user which one.")
+
+    def facilities_in_state(self, text: str) -> List[Dict]:
+        """Return every facility in a state given its id or name."""
+        self.refresh()
+        return [self.facilities[f] for f in self._states.get(normalize(text), [])]
+
+
+def resolving_facilities(tool: Callable, resolver: FacilityResolver, params: Sequence[str]) -> Callable:
+    """
+    Wrap a tool so the given facility parameters accept ids, names or partial names.
+    The wrapper keeps the tool's name and signature, so the model sees the same declaration.
+    """
+    signature = inspect.signature(tool)
+    params = [p for p in params if p in signature.parameters]
+
+    @functools.wraps(tool)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind_partial(*args, **kwargs)
+        for param in params:
+            value = bound.arguments.get(param)
+            if value:
+                try:
+                    bound.arguments[param] = resolver.resolve(value)["facilityId"]
+                except LookupError as e:
+                    return {"status": "error", "message": str(e)}
+                except CATALOG_ERRORS as e:
+                    # The tool can still answer for exact ids, so an outage of the catalog is not fatal
+                    logging.warning(f"Facility catalog unavailable, passing {param}={value!r} through: {e}")
+        return tool(*bound.args, **bound.kwargs)
+
+    wrapper.__doc__ = (
+        (tool.__doc__ or "").rstrip()
+        + f"\n{', '.join(params)} accepts a facility id, name or partial name (e.g. 'FAC1', 'Facility 1', 'fac 1 vic')."
+    )
+    return wrapper
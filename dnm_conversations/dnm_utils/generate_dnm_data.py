@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Bulk generator for the DNM logistics graph.
+
+Produces the same model as data.cypher (States, Facilities, Articles, Journeys, ArticleVisits,
+Containers and their relationships, with dwell/transit times, journey times, :OpenJourney labels
+and facility load counters) for any number of articles. Articles are generated one at a time and
+streamed out, so memory stays constant in the number of articles. The same seed gives the same graph.
+
+Two output formats:
+- csv: one CSV file per node label / relationship type, ready for neo4j-admin import.
+- cypher: batched UNWIND loads through the dnm-graph source in tools.yaml.
+
+Usage (from the repository root):
+    python -m dnm_conversations.dnm_utils.generate_dnm_data --articles 10000000 --out /data/dnm-import
+    python -m dnm_conversations.dnm_utils.generate_dnm_data --articles 100000 --format cypher
+
+Then, for csv (the database must not exist yet):
+    neo4j-admin database import full conversation --nodes=State=states.csv ... (printed at the end)
+"""
+
+import os
+import csv
+import random
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLS_FILE = "dnm_conversations/tools.yaml"
+
+# Share of facilities per state, same weighting as data.cypher (15/15/10/4/4/2 out of 50)
+STATES = [
+    ("VIC", "Victoria", 0.30),
+    ("NSW", "New South Wales", 0.30),
+    ("QLD", "Queensland", 0.20),
+    ("WA", "Western Australia", 0.08),
+    ("SA", "South Australia", 0.08),
+    ("TAS", "Tasmania", 0.04),
+]
+
+# Share of delivered / at facility / in transit articles (1000 / 150 / 100 in data.cypher)
+STATUS_MIX = {"D": 0.80, "F": 0.12, "T": 0.08}
+OPEN_STATUSES = ("T", "F")
+
+START_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+LAST_VISIT_MAX_DWELL_SECONDS = 99000
+
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (s:State) REQUIRE s.stateId IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (f:Facility) REQUIRE f.facilityId IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Article) REQUIRE a.articleId IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (v:ArticleVisit) REQUIRE v.visitId IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Container) REQUIRE c.containerId IS UNIQUE",
+    "CREATE INDEX journey_id IF NOT EXISTS FOR (j:Journey) ON (j.journeyId)",
+    "CREATE INDEX open_journey_time IF NOT EXISTS FOR (j:OpenJourney) ON (j.journeyTime)",
+    "CREATE INDEX journey_articlestatus IF NOT EXISTS FOR (j:Journey) ON (j.articleStatus)",
+    "CREATE INDEX articlevisit_facilityid IF NOT EXISTS FOR (v:ArticleVisit) ON (v.facilityId)",
+    "CREATE INDEX container_tofacilityid IF NOT EXISTS FOR (c:Container) ON (c.toFacilityId)",
+]
+
+
+def build_facilities(count: int) -> List[Dict]:
+    """Spread facilities over the states with the data.cypher weighting."""
+    if count < len(STATES):
+        raise ValueError(f"Need at least {len(STATES)} facilities, one per state")
+    facilities = []
+    cumulative = 0.0
+    boundaries = []
+    for state_id, _, share in STATES:
+        cumulative += share
+        boundaries.append((state_id, cumulative * count))
+    for i in range(1, count + 1):
+        state_id = next((s for s, bound in boundaries if i <= bound + 1e-9), STATES[-1][0])
+        facilities.append({
+            "facilityId": f"FAC{i}",
+            "facilityName": f"Facility {i} ({state_id})",
+            "stateId": state_id,
+        })
+    # Guarantee every state has at least one facility
+    for idx, (state_id, _, _) in enumerate(STATES):
+        if not any(f["stateId"] == state_id for f in facilities):
+            facility = facilities[-(idx + 1)]
+            facility["stateId"] = state_id
+            facility["facilityName"] = f"Facility {facility['facilityId'][3:]} ({state_id})"
+    return facilities
+
+
+def _minutes(seconds: float) -> int:
+    return int(seconds // 60)
+
+
+def _iso(epoch_seconds: float) -> str:
+    return (START_DATE + timedelta(seconds=epoch_seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ArticleGenerator:
+    """Generates articles with their journey, visits and container one at a time."""
+
+    def __init__(self, facilities: List[Dict], seed: int, status_mix: Dict[str, float] = STATUS_MIX):
+        self.rng = random.Random(seed)
+        self.facilities = facilities
+        self.by_state: Dict[str, List[Dict]] = {}
+        for facility in facilities:
+            self.by_state.setdefault(facility["stateId"], []).append(facility)
+        self.state_ids = list(self.by_state)
+        self.statuses = list(status_mix)
+        self.status_weights = [status_mix[s] for s in self.statuses]
+
+    def _pick_mid(self, exclude: set) -> Dict:
+        # Rejection sampling keeps this O(1) for large facility counts
+        while True:
+            facility = self.rng.choice(self.facilities)
+            if facility["facilityId"] not in exclude:
+                return facility
+
+    def generate(self, number: int) -> Dict:
+        rng = self.rng
+        article_id = f"ART-{number}"
+        status = rng.choices(self.statuses, self.status_weights)[0]
+        from_state = rng.choice(self.state_ids)
+        to_state = rng.choice(self.state_ids)
+        created = rng.randrange(364) * 86400 + rng.randrange(23) * 3600
+
+        start = rng.choice(self.by_state[from_state])
+        end = rng.choice(self.by_state[to_state])
+        route = [start]
+        used = {start["facilityId"], end["facilityId"]}
+        for _ in range(min(2 + rng.randrange(3), len(self.facilities) - len(used))):
+            mid = self._pick_mid(used)
+            used.add(mid["facilityId"])
+            route.append(mid)
+        if status == "D":
+            route.append(end)
+
+        entries = [created + (idx * 10 + rng.randrange(5)) * 3600 for idx in range(len(route))]
+        visits = []
+        for idx, facility in enumerate(route):
+            entry = entries[idx]
+            if idx + 1 < len(route):
+                exit_time = entry + int(rng.random() * (entries[idx + 1] - entry))
+                transit = _minutes(entries[idx + 1] - exit_time)
+            else:
+                exit_time = entry + int(rng.random() * LAST_VISIT_MAX_DWELL_SECONDS)
+                transit = None
+            visits.append({
+                "visitId": f"V-{number}-{idx}",
+                "facilityId": facility["facilityId"],
+                "seq": idx,
+                "entryDate": entry,
+                "lastScan": exit_time,
+                "dwellTime": _minutes(exit_time - entry),
+                "transitTime": transit,
+            })
+
+        if status == "D":
+            to_facility_id = end["facilityId"]
+        else:
+            visited = {v["facilityId"] for v in visits}
+            candidates = [f for f in self.by_state[to_state] if f["facilityId"] not in visited]
+            to_facility_id = rng.choice(candidates)["facilityId"] if candidates else None
+
+        container = None
+        if status == "T":
+            last_facility_id = visits[-1]["facilityId"]
+            destination = to_facility_id
+            if destination is None:
+                options = [f for f in self.by_state[to_state] if f["facilityId"] != last_facility_id]
+                destination = rng.choice(options or self.facilities)["facilityId"]
+            container = {
+                "containerId": f"{last_facility_id}_{destination}",
+                "fromFacilityId": last_facility_id,
+                "toFacilityId": destination,
+            }
+
+        return {
+            "articleId": article_id,
+            "status": status,
+            "fromState": from_state,
+            "toState": to_state,
+            "createDate": created,
+            "fromFacilityId": visits[0]["facilityId"],
+            "toFacilityId": to_facility_id,
+            "journeyTime": _minutes(visits[-1]["lastScan"] - visits[0]["entryDate"]),
+            "visits": visits,
+            "container": container,
+        }
+
+    def stream(self, articles: int) -> Iterator[Dict]:
+        for number in range(1, articles + 1):
+            yield self.generate(number)
+
+
+class LoadCounter:
+    """Tracks the facility load counters and distinct containers while streaming."""
+
+    def __init__(self):
+        self.dwelling = Counter()
+        self.inbound = Counter()
+        self.containers: Dict[str, Dict] = {}
+
+    def add(self, article: Dict) -> None:
+        if article["status"] == "F":
+            self.dwelling[article["visits"][-1]["facilityId"]] += 1
+        container = article["container"]
+        if container:
+            self.inbound[container["toFacilityId"]] += 1
+            self.containers.setdefault(container["containerId"], container)
+
+
+class CsvSink:
+    """Writes neo4j-admin import CSV files."""
+
+    NODE_FILES = {
+        "states.csv": ["stateId:ID(State)", "stateName", ":LABEL"],
+        "facilities.csv": ["facilityId:ID(Facility)", "facilityName", "dwellingCount:long", "inboundCount:long", ":LABEL"],
+        "articles.csv": ["articleId:ID(Article)", "articleName", "fromState", "toState", "createDate:datetime",
+                         "fromFacilityId", "toFacilityId", ":LABEL"],
+        "journeys.csv": ["journeyId:ID(Journey)", "articleStatus", "journeyTime:long", ":LABEL"],
+        "visits.csv": ["visitId:ID(ArticleVisit)", "facilityId", "seq:int", "entryDate:datetime",
+                       "lastScan:datetime", "dwellTime:long", ":LABEL"],
+        "containers.csv": ["containerId:ID(Container)", "fromFacilityId", "toFacilityId", ":LABEL"],
+    }
+    RELATIONSHIP_FILES = {
+        "belongs_to.csv": [":START_ID(Facility)", ":END_ID(State)", ":TYPE"],
+        "has_journey.csv": [":START_ID(Article)", ":END_ID(Journey)", ":TYPE"],
+        "includes_visit.csv": [":START_ID(Journey)", ":END_ID(ArticleVisit)", ":TYPE"],
+        "first_visit.csv": [":START_ID(Journey)", ":END_ID(ArticleVisit)", ":TYPE"],
+        "last_visit.csv": [":START_ID(Journey)", ":END_ID(ArticleVisit)", ":TYPE"],
+        "at_facility.csv": [":START_ID(ArticleVisit)", ":END_ID(Facility)", ":TYPE"],
+        "next_visit.csv": [":START_ID(ArticleVisit)", ":END_ID(ArticleVisit)", "transitTime:long", ":TYPE"],
+        "transported_by.csv": [":START_ID(ArticleVisit)", ":END_ID(Container)", ":TYPE"],
+    }
+
+    def __init__(self, out_dir: str):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.files = {}
+        self.writers = {}
+        for name, header in {**self.NODE_FILES, **self.RELATIONSHIP_FILES}.items():
+            handle = open(os.path.join(out_dir, name), "w", newline="")
+            self.files[name] = handle
+            self.writers[name] = csv.writer(handle)
+            self.writers[name].writerow(header)
+
+    def write_states(self, facilities: List[Dict]) -> None:
+        for state_id, state_name, _ in STATES:
+            self.writers["states.csv"].writerow([state_id, state_name, "State"])
+        for facility in facilities:
+            self.writers["belongs_to.csv"].writerow([facility["facilityId"], facility["stateId"], "BELONGS_TO"])
+
+    def write_article(self, article: Dict) -> None:
+        w = self.writers
+        article_id = article["articleId"]
+        labels = "Journey;OpenJourney" if article["status"] in OPEN_STATUSES else "Journey"
+        w["articles.csv"].writerow([
+            article_id, article_id, article["fromState"], article["toState"], _iso(article["createDate"]),
+            article["fromFacilityId"], article["toFacilityId"] or "", "Article",
+        ])
+        w["journeys.csv"].writerow([article_id, article["status"], article["journeyTime"], labels])
+        w["has_journey.csv"].writerow([article_id, article_id, "HAS_JOURNEY"])
+        visits = article["visits"]
+        for visit in visits:
+            w["visits.csv"].writerow([
+                visit["visitId"], visit["facilityId"], visit["seq"], _iso(visit["entryDate"]),
+                _iso(visit["lastScan"]), visit["dwellTime"], "ArticleVisit",
+            ])
+            w["includes_visit.csv"].writerow([article_id, visit["visitId"], "INCLUDES_VISIT"])
+            w["at_facility.csv"].writerow([visit["visitId"], visit["facilityId"], "AT_FACILITY"])
+        for prev, nxt in zip(visits, visits[1:]):
+            w["next_visit.csv"].writerow([prev["visitId"], nxt["visitId"], prev["transitTime"], "NEXT_VISIT"])
+        w["first_visit.csv"].writerow([article_id, visits[0]["visitId"], "FIRST_FACILITY_VISIT"])
+        w["last_visit.csv"].writerow([article_id, visits[-1]["visitId"], "LAST_FACILITY_VISIT"])
+        if article["container"]:
+            w["transported_by.csv"].writerow([visits[-1]["visitId"], article["container"]["containerId"], "TRANSPORTED_BY"])
+
+    def finish(self, facilities: List[Dict], load: LoadCounter) -> None:
+        for facility in facilities:
+            self.writers["facilities.csv"].writerow([
+                facility["facilityId"], facility["facilityName"],
+                load.dwelling[facility["facilityId"]], load.inbound[facility["facilityId"]], "Facility",
+            ])
+        for container in load.containers.values():
+            self.writers["containers.csv"].writerow([
+                container["containerId"], container["fromFacilityId"], container["toFacilityId"], "Container",
+            ])
+        for handle in self.files.values():
+            handle.close()
+
+        nodes = " ".join(f"--nodes={os.path.join(self.out_dir, name)}" for name in self.NODE_FILES)
+        relationships = " ".join(
+            f"--relationships={os.path.join(self.out_dir, name)}" for name in self.RELATIONSHIP_FILES)
+        print("\nImport with:")
+        print(f"neo4j-admin database import full <database> {nodes} {relationships}")
+        print("Then create the constraints and indexes:")
+        for statement in SCHEMA_STATEMENTS:
+            print(f"  {statement};")
+
+
+class CypherSink:
+    """Loads the articles through batched UNWIND statements."""
+
+    SETUP_STATEMENTS = [
+        """
+        UNWIND $states AS s
+        MERGE (st:State {stateId: s.stateId}) SET st.stateName = s.stateName
+        """,
+        """
+        UNWIND $facilities AS f
+        MATCH (s:State {stateId: f.stateId})
+        MERGE (fac:Facility {facilityId: f.facilityId}) SET fac.facilityName = f.facilityName
+        MERGE (fac)-[:BELONGS_TO]->(s)
+        """,
+    ]
+
+    ARTICLE_STATEMENT = """
+    UNWIND $articles AS row
+    CREATE (a:Article {
+      articleId: row.articleId, articleName: row.articleId, fromState: row.fromState, toState: row.toState,
+      createDate: datetime(row.createDate), fromFacilityId: row.fromFacilityId, toFacilityId: row.toFacilityId
+    })
+    CREATE (j:Journey {journeyId: row.articleId, articleStatus: row.status, journeyTime: row.journeyTime})
+    CREATE (a)-[:HAS_JOURNEY]->(j)
+    FOREACH (_ IN CASE WHEN row.status IN ['T', 'F'] THEN [1] ELSE [] END | SET j:OpenJourney)
+    WITH j, row
+    UNWIND row.visits AS v
+    MATCH (f:Facility {facilityId: v.facilityId})
+    CREATE (av:ArticleVisit {
+      visitId: v.visitId, facilityId: v.facilityId, seq: v.seq, entryDate: datetime(v.entryDate),
+      lastScan: datetime(v.lastScan), dwellTime: v.dwellTime
+    })
+    CREATE (j)-[:INCLUDES_VISIT]->(av)
+    CREATE (av)-[:AT_FACILITY]->(f)
+    FOREACH (_ IN CASE WHEN v.seq = 0 THEN [1] ELSE [] END | CREATE (j)-[:FIRST_FACILITY_VISIT]->(av))
+    FOREACH (_ IN CASE WHEN v.seq = size(row.visits) - 1 THEN [1] ELSE [] END | CREATE (j)-[:LAST_FACILITY_VISIT]->(av))
+    """
+
+    NEXT_VISIT_STATEMENT = """
+    UNWIND $links AS l
+    MATCH (a:ArticleVisit {visitId: l.fromVisitId})
+    MATCH (b:ArticleVisit {visitId: l.toVisitId})
+    CREATE (a)-[:NEXT_VISIT {transitTime: l.transitTime}]->(b)
+    """
+
+    TRANSPORTED_BY_STATEMENT = """
+    UNWIND $rows AS t
+    MATCH (av:ArticleVisit {visitId: t.visitId})
+    MERGE (c:Container {containerId: t.containerId})
+    ON CREATE SET c.fromFacilityId = t.fromFacilityId, c.toFacilityId = t.toFacilityId
+    CREATE (av)-[:TRANSPORTED_BY]->(c)
+    """
+
+    LOAD_STATEMENT = """
+    UNWIND $rows AS row
+    MATCH (f:Facility {facilityId: row.facilityId})
+    SET f.dwellingCount = row.dwelling, f.inboundCount = row.inbound, f.loadUpdatedAt = datetime()
+    """
+
+    def __init__(self, tools_file: str, source: str, batch_size: int):
+        from toolbox_utils.neo4j_source import get_driver
+
+        self.driver, database = get_driver(tools_file, source)
+        self.session = self.driver.session(database=database)
+        self.batch_size = batch_size
+        self.batch: List[Dict] = []
+        self.loaded = 0
+
+    def write_states(self, facilities: List[Dict]) -> None:
+        for statement in SCHEMA_STATEMENTS:
+            self.session.run(statement).consume()
+        states = [{"stateId": s, "stateName": name} for s, name, _ in STATES]
+        self.session.run(self.SETUP_STATEMENTS[0], states=states).consume()
+        self.session.run(self.SETUP_STATEMENTS[1], facilities=facilities).consume()
+
+    def write_article(self, article: Dict) -> None:
+        self.batch.append(article)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        articles, links, transported = [], [], []
+        for article in self.batch:
+            visits = [{**v, "entryDate": _iso(v["entryDate"]), "lastScan": _iso(v["lastScan"])}
+                      for v in article["visits"]]
+            articles.append({**article, "createDate": _iso(article["createDate"]), "visits": visits, "container": None})
+            links.extend(
+                {"fromVisitId": a["visitId"], "toVisitId": b["visitId"], "transitTime": a["transitTime"]}
+                for a, b in zip(visits, visits[1:])
+            )
+            if article["container"]:
+                transported.append({"visitId": visits[-1]["visitId"], **article["container"]})
+
+        def load(tx):
+            tx.run(self.ARTICLE_STATEMENT, articles=articles).consume()
+            tx.run(self.NEXT_VISIT_STATEMENT, links=links).consume()
+            if transported:
+                tx.run(self.TRANSPORTED_BY_STATEMENT, rows=transported).consume()
+
+        self.session.execute_write(load)
+        self.loaded += len(self.batch)
+        logging.info(f"Loaded {self.loaded} articles")
+        self.batch = []
+
+    def finish(self, facilities: List[Dict], load: LoadCounter) -> None:
+        self.flush()
+        rows = [
+            {"facilityId": f["facilityId"], "dwelling": load.dwelling[f["facilityId"]],
+             "inbound": load.inbound[f["facilityId"]]}
+            for f in facilities
+        ]
+        self.session.run(self.LOAD_STATEMENT, rows=rows).consume()
+        self.session.close()
+        self.driver.close()
+
+
+def main():
+    """Generate the DNM graph."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic DNM logistics graph.")
+    parser.add_argument("--articles", type=int, default=1250, help="number of articles")
+    parser.add_argument("--facilities", type=int, default=50, help="number of facilities")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, the same seed gives the same graph")
+    parser.add_argument("--format", choices=["csv", "cypher"], default="csv")
+    parser.add_argument("--out", default="dnm-import", help="csv: output directory")
+    parser.add_argument("--tools-file", default=TOOLS_FILE, help="cypher: toolbox tools.yaml with the dnm-graph source")
+    parser.add_argument("--source", default="dnm-graph", help="cypher: Neo4j source name in the tools file")
+    parser.add_argument("--batch-size", type=int, default=5000, help="cypher: articles per transaction")
+    args = parser.parse_args()
+
+    facilities = build_facilities(args.facilities)
+    generator = ArticleGenerator(facilities, args.seed)
+    load = LoadCounter()
+    sink = CsvSink(args.out) if args.format == "csv" else CypherSink(args.tools_file, args.source, args.batch_size)
+
+    sink.write_states(facilities)
+    for count, article in enumerate(generator.stream(args.articles), start=1):
+        sink.write_article(article)
+        load.add(article)
+        if args.format == "csv" and count % 1000000 == 0:
+            logging.info(f"Generated {count} articles")
+    sink.finish(facilities, load)
+    logging.info(f"Generated {args.articles} articles over {len(facilities)} facilities (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Question templates for the DNM intent fast path (see intent_router.py).
+
+match_question() maps a user message to exactly one Route: the tool to call, its arguments and,
+for answers that can be rendered without the model, a template. It is deliberately conservative:
+it returns None, so the model handles the question, whenever
+- no template or more than one template matches ('Which items are stuck in transit to facility 4?'),
+- the question is negated ('undelivered', 'not been delivered'),
+- the question is narrowed by something the template cannot express ('delivered late',
+  'arrived at Facility 3', 'page 2'), such as a state ('in transit in VIC'), or names several
+  facilities or articles ('facility 3 or facility 5', 'via facility 2', 'ART-12 and ART-13').
+
+This module has no ADK dependency so the templates can be tested on their own.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+STATUS_CODES = [
+    (r"\bdeliver(ed|ies|y)?\b", "D"),
+    (r"\b(in transit|moving|on the move|in flight)\b", "T"),
+    (r"\b(at (a |the )?facilit(y|ies)|in (a |the )?warehouses?|dwelling)\b", "F"),
+]
+STATUS_NAMES = {"D": "delivered", "T": "in transit", "F": "at a facility"}
+
+STATE_CODES = ("vic", "nsw", "qld", "wa", "sa", "tas", "nt", "act")
+STATE_NAMES = ("victoria", "new south wales", "queensland", "western australia", "south australia",
+               "tasmania", "northern territory", "australian capital territory")
+
+DEFAULT_THRESHOLD = 5
+DEFAULT_LIMIT = 5
+MAX_LISTED = 10
+
+# 'facility 3', 'fac3', 'FAC3 (VIC)', 'facility 3 vic'; a state suffix needs parentheses or a known state code
+FACILITY = (r"(?P<facility>\bfac(?:ility)?\s*\d+\b"
+            r"(?:\s*\(\s*[a-z]{2,3}\s*\)|\s+(?:" + "|".join(STATE_CODES) + r")\b)?)")
+ARTICLE = r"(?P<article>\bart[- ]?\d+\b)"
+ITEMS = r"\b(articles?|items?|parcels?|shipments?)\b"
+
+NEGATION = re.compile(r"\b(not|never|no longer|yet to)\b|n't\b|\bun\w*deliver")
+# Words that narrow a question beyond what any template can answer
+MODIFIERS = re.compile(
+    r"\b(late|early|on time|overdue|arrived|arriving|departed|from|to|between|since|before|after|during|"
+    r"yesterday|today|tomorrow|last|this (week|month|year)|per|each|by|average|percent(age)?|"
+    r"page|next|more|rest|other)\b"
+)
+# A state outside a facility reference scopes the question, which no template can express
+STATES = re.compile(r"\b(" + "|".join(STATE_NAMES + STATE_CODES) + r")\b")
+# Words joining several entities or conditions
+CONJUNCTIONS = re.compile(r"\b(and|or|via|with|plus|also|both|either|as well as)\b|[&/+]")
+
+
+@dataclass
+class Route:
+    """A matched question: the tool to call, its arguments and how to answer."""
+    intent: str
+    tool: str
+    args: Dict
+    render: Optional[Callable[[object, Dict], str]] = None  # None -> let the model phrase the result
+
+
+def _number(text: str, patterns: List[str], default: int) -> int:
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return int(match.group(1))
+    return default
+
+
+def _status_code(text: str) -> Optional[str]:
+    codes = {code for pattern, code in STATUS_CODES if re.search(pattern, text)}
+    return codes.pop() if len(codes) == 1 else None
+
+
+# --- Template answers ---
+
+def _render_congestion(rows, args) -> str:
+    if not rows:
+        return f"The network is not congested: no facility has {args['threshold']} or more articles dwelling."
+    lines = [f"{len(rows)} {'facility has' if len(rows) == 1 else 'facilities have'} "
+             f"{args['threshold']} or more articles dwelling:"]
+    for row in rows[:MAX_LISTED]:
+        lines.append(f"- {row['facility']}: {row['currentLoad']} articles ({row['congestionLevel']}), "
+                     f"{row.get('inboundLoad', 0)} more in transit to it")
+    if len(rows) > MAX_LISTED:
+        lines.append(f"...and {len(rows) - MAX_LISTED} more.")
+    lines.append("You can ask which articles are dwelling at any of these facilities.")
+    return "\n".join(lines)
+
+
+def _render_status_summary(rows, args) -> str:
+    row = rows[0] if rows else {}
+    count = row.get("articleCount", 0)
+    status = STATUS_NAMES[args["statusCode"]]
+    if not count:
+        return f"There are no articles {status}."
+    average = row.get("avgJourneyTimeInMinutes")
+    average_text = f" Their average journey time is {average:.0f} minutes." if average is not None else ""
+    return f"There are {count} articles {status}.{average_text}"
+
+
+def _render_facility_count(rows, args) -> str:
+    if not rows:
+        return f"There is no facility {args['facilityId']}."
+    row = rows[0]
+    return (f"{row['dwellingCount']} undelivered articles are at {row.get('facility') or row['facilityId']}, "
+            f"and {row['inboundCount']} more are in transit to it.")
+
+
+def _render_longest_open(rows, args) -> str:
+    if not rows:
+        return "There are no open journeys."
+    lines = [f"The {len(rows)} longest open journeys are:"]
+    for row in rows:
+        lines.append(f"- {row['article_id']}: open for {row['duration']} minutes "
+                     f"({STATUS_NAMES.get(row.get('status'), 'undelivered')})")
+    return "\n".join(lines)
+
+
+def _render_article_list(description: str) -> Callable:
+    def render(rows, args) -> str:
+        if not rows:
+            return f"There are no articles {description} {args['facilityId']}."
+        ids = ", ".join(row["id"] for row in rows)
+        more = " There may be more; ask for the next page." if len(rows) >= args.get("page_size", 25) else ""
+        return f"Articles {description} {args['facilityId']}: {ids}.{more}"
+    return render
+
+
+# --- Templates ---
+# Each matcher gets the lowercased, whitespace-collapsed text and the facility it mentions (or None),
+# and returns a Route or None.
+
+def _congestion(text: str, facility) -> Optional[Route]:
+    if facility:
+        return None  # 'Is facility 3 congested?' is about one facility, not the network
+    if any(re.search(pattern, text) for pattern, _ in STATUS_CODES):
+        return None  # congestion counts all dwelling articles, not those with some status
+    if re.search(r"\b(network|facilities|hubs)\b.*\b(busy|congest\w*|overload\w*|bottlenecks?|overcrowded)\b", text) \
+            or re.search(r"\b(congestion|bottlenecks?)\b", text):
+        threshold = _number(text, [r"\bthreshold (?:of )?(\d+)\b", r"\b(?:more than|over|at least) (\d+)\b"],
+                            DEFAULT_THRESHOLD)
+        return Route("network_congestion", "check_network_congestion", {"threshold": threshold}, _render_congestion)
+    return None
+
+
+def _article_journey(text: str, facility) -> Optional[Route]:
+    match = re.search(ARTICLE, text)
+    if match and re.search(r"\b(where|track|journey|history|route|status)\b", text):
+        article_id = "ART-" + re.sub(r"\D", "", match.group("article"))
+        return Route("article_journey", "get_article_journey", {"articleId": article_id})
+    return None
+
+
+def _longest_open(text: str, facility) -> Optional[Route]:
+    if re.search(r"\b(longest|oldest|most delayed|delayed|stuck)\b", text) and re.search(
+            r"\b(journeys?|articles?|items?|parcels?|shipments?)\b", text):
+        limit = _number(text, [r"\btop (\d+)\b", r"\b(\d+) (?:longest|oldest|most delayed|delayed)\b"], DEFAULT_LIMIT)
+        return Route("longest_open_journeys", "get_longest_open_journeys", {"limit_count": limit}, _render_longest_open)
+    return None
+
+
+def _in_transit_to(text: str, facility) -> Optional[Route]:
+    if facility and not re.search(r"\bhow many\b", text) and re.search(
+            r"\b(in transit|heading|on the way|inbound|travell?ing) to " + FACILITY, text):
+        return Route("in_transit_to_facility", "get_intransit_articles_to_facility",
+                     {"facilityId": facility}, _render_article_list("in transit to"))
+    return None
+
+
+def _dwelling_at(text: str, facility) -> Optional[Route]:
+    if facility and not re.search(r"\bhow many\b", text) and re.search(ITEMS + r".*\b(at|in) " + FACILITY, text):
+        return Route("dwelling_at_facility", "get_articles_dwelling_at_facility",
+                     {"facilityId": facility}, _render_article_list("dwelling at"))
+    return None
+
+
+def _facility_count(text: str, facility) -> Optional[Route]:
+    if facility and re.search(r"\bhow many\b", text) and re.search(ITEMS + r".*\b(at|in) " + FACILITY, text):
+        return Route("facility_count", "count_articles_at_facility", {"facilityId": facility}, _render_facility_count)
+    return None
+
+
+def _status_summary(text: str, facility) -> Optional[Route]:
+    if facility or not (re.search(r"\bhow many\b", text) and re.search(ITEMS, text)):
+        return None
+    code = _status_code(text)
+    if code:
+        return Route("status_summary", "summarize_articles_by_status", {"statusCode": code}, _render_status_summary)
+    return None
+
+
+MATCHERS = [_congestion, _article_journey, _longest_open, _in_transit_to, _dwelling_at, _facility_count, _status_summary]
+
+# Modifier words that belong to a template itself and do not narrow it
+TEMPLATE_WORDS = {
+    "in_transit_to_facility": {"to"},
+    "network_congestion": {"more"},  # 'more than 10 articles' sets the threshold
+}
+
+
+def match_question(text: str) -> Optional[Route]:
+    """Map a user message to a Route, or None if no single template answers it exactly."""
+    text = " ".join(text.lower().split())
+    if NEGATION.search(text):
+        return None
+
+    facilities = [match.group("facility") for match in re.finditer(FACILITY, text)]
+    if len(facilities) > 1 or len(re.findall(ARTICLE, text)) > 1:
+        return None
+    facility = facilities[0] if facilities else None
+    rest = re.sub(FACILITY, " ", text)
+    if STATES.search(rest) or CONJUNCTIONS.search(rest):
+        return None
+
+    routes = [route for route in (matcher(text, facility) for matcher in MATCHERS) if route]
+    if len(routes) != 1:
+        return None
+    route = routes[0]
+
+    # Anything left after removing the template's own wording must not narrow the question
+    allowed = TEMPLATE_WORDS.get(route.intent, set())
+    if any(modifier.group(0) not in allowed for modifier in MODIFIERS.finditer(rest)):
+        return None
+    return route
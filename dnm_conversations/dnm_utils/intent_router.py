@@ -0,0 +1,99 @@
+"""
+Deterministic fast path for the most common logistics questions.
+
+The router runs as a before_model_callback on the DNM root agent. When the latest user message
+matches exactly one of the high-frequency templates in intent_matching.py, it maps the status
+vocabulary to codes (delivered -> D, in transit -> T, at facility -> F) and extracts the parameters
+instead of waiting for a model planning turn. Then either:
+- the router awaits the tool itself, renders the answer from a template and the model is skipped
+  entirely (2 model calls saved), or
+- the router returns the tool call as the model's response. ADK runs the tool and records the call
+  and its result in the session like any model-requested call, so the model only phrases the
+  answer and later turns see the same history (1 call saved).
+
+Pass the async tools from parallel_tools() so the direct calls run off the event loop; synchronous
+tools are run with asyncio.to_thread. The tools can also be given as a function returning them
+(e.g. ToolboxToolset.load), which is called on the first routed question. Anything that does not
+match falls through to the model unchanged.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Callable, List, Optional, Union
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .intent_matching import Route, match_question
+
+logger = logging.getLogger(__name__)
+
+
+class IntentRouter:
+    """before_model_callback that answers templated questions without a planning turn."""
+
+    def __init__(self, tools: Union[List[Callable], Callable[[], List[Callable]]]):
+        self._load_tools = tools if callable(tools) else (lambda: tools)
+        self.tools = None
+        self.stats = {"routed": 0, "answered_from_template": 0, "skipped_model_calls": 0, "fallbacks": 0}
+
+    @staticmethod
+    def _latest_user_text(llm_request: LlmRequest) -> Optional[str]:
+        # Only route the first model call of a turn, i.e. when the user spoke last
+        if not llm_request.contents or llm_request.contents[-1].role != "user":
+            return None
+        parts = llm_request.contents[-1].parts or []
+        if any(part.function_response for part in parts):
+            return None
+        text = " ".join(part.text for part in parts if part.text)
+        return text or None
+
+    async def _call(self, route: Route):
+        tool = self.tools[route.tool]
+        if asyncio.iscoroutinefunction(tool):
+            result = await tool(**route.args)
+        else:
+            result = await asyncio.to_thread(tool, **route.args)
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError:
+                pass
+        if isinstance(result, dict) and result.get("status") == "error":
+            raise LookupError(result.get("message"))
+        return result
+
+    async def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        text = self._latest_user_text(llm_request)
+        route = match_question(text) if text else None
+        if route is None:
+            return None
+        if self.tools is None:
+            self.tools = {tool.__name__: tool for tool in await asyncio.to_thread(self._load_tools)}
+        if route.tool not in self.tools:
+            return None
+
+        if route.render is not None:
+            try:
+                result = await self._call(route)
+            except Exception as e:
+                # Let the model handle it, e.g. ask which facility the user meant
+                logger.info(f"Intent fast path {route.intent} fell back to the model: {e}")
+                self.stats["fallbacks"] += 1
+                return None
+            saved = 2
+            self.stats["answered_from_template"] += 1
+            part = types.Part(text=route.render(result or [], route.args))
+        else:
+            saved = 1
+            part = types.Part(function_call=types.FunctionCall(name=route.tool, args=route.args))
+
+        self.stats["routed"] += 1
+        self.stats["skipped_model_calls"] += saved
+        callback_context.state["fastpath_skipped_model_calls"] = (
+            callback_context.state.get("fastpath_skipped_model_calls", 0) + saved)
+        logger.info(f"Intent fast path {route.intent} -> {route.tool}({route.args}): skipped {saved} model calls "
+                    f"({self.stats['skipped_model_calls']} in total)")
+        return LlmResponse(content=types.Content(role="model", parts=[part]))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Top-K index for the longest open (undelivered) journeys in the DNM graph.
+
+Open journeys ('T' and 'F') carry an extra :OpenJourney label and a range index on
+OpenJourney(journeyTime). get_longest_open_journeys walks that index in descending order,
+so it reads K nodes instead of sorting every journey.
+
+Writers that change a journey status call sync_open_labels() in the same transaction.
+
+Usage (from the repository root):
+    python -m dnm_conversations.dnm_utils.open_journeys rebuild
+    python -m dnm_conversations.dnm_utils.open_journeys benchmark --articles 1000000 --database bench
+"""
+
+import time
+import logging
+import argparse
+import statistics
+from typing import Dict, List
+
+from toolbox_utils.neo4j_source import get_driver
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLS_FILE = "dnm_conversations/tools.yaml"
+
+OPEN_STATUSES = ["T", "F"]
+
+CREATE_INDEX_STATEMENTS = [
+    "CREATE INDEX journey_id IF NOT EXISTS FOR (j:Journey) ON (j.journeyId)",
+    "CREATE INDEX open_journey_time IF NOT EXISTS FOR (j:OpenJourney) ON (j.journeyTime)",
+]
+
+REBUILD_STATEMENTS = [
+    """
+    MATCH (j:OpenJourney) WHERE NOT j.articleStatus IN $openStatuses
+    CALL { WITH j REMOVE j:OpenJourney } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+    MATCH (j:Journey) WHERE j.articleStatus IN $openStatuses
+    CALL { WITH j SET j:OpenJourney } IN TRANSACTIONS OF 10000 ROWS
+    """,
+]
+
+SYNC_OPEN_LABEL_STATEMENT = """
+UNWIND $journeyIds AS journeyId
+MATCH (j:Journey {journeyId: journeyId})
+FOREACH (_ IN CASE WHEN j.articleStatus IN $openStatuses THEN [1] ELSE [] END | SET j:OpenJourney)
+FOREACH (_ IN CASE WHEN j.articleStatus IN $openStatuses THEN [] ELSE [1] END | REMOVE j:OpenJourney)
+"""
+
+# The statement get_longest_open_journeys used before the index: a full sort of every journey.
+FULL_SORT_QUERY = """
+MATCH (a:Article )-[:HAS_JOURNEY]->(j:Journey)
+RETURN a.articleId as article_id , a.articleName as article_name, j.journeyTime AS duration
+ORDER BY j.journeyTime DESC
+LIMIT $limit_count
+"""
+
+# Same statement as get_longest_open_journeys in tools.yaml.
+TOP_K_QUERY = """
+MATCH (j:OpenJourney)
+WHERE j.journeyTime IS NOT NULL
+WITH j ORDER BY j.journeyTime DESC
+LIMIT $limit_count
+MATCH (a:Article)-[:HAS_JOURNEY]->(j)
+RETURN a.articleId as article_id , a.articleName as article_name, j.journeyTime AS duration, j.articleStatus AS status
+ORDER BY duration DESC
+"""
+
+SEED_STATEMENT = """
+UNWIND range($start, $end) AS i
+WITH i, rand() AS r
+CREATE (a:Article:BenchData {articleId: 'BENCH-' + i, articleName: 'BENCH-' + i})
+CREATE (j:Journey:BenchData {
+  journeyId: 'BENCH-' + i,
+  articleStatus: CASE WHEN r < 0.8 THEN 'D' WHEN r < 0.92 THEN 'F' ELSE 'T' END,
+  journeyTime: toInteger(rand() * 20000)
+})
+CREATE (a)-[:HAS_JOURNEY]->(j)
+"""
+
+CLEANUP_STATEMENT = """
+MATCH (n:BenchData)
+CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+
+def sync_open_labels(tx, journey_ids: List[str]) -> None:
+    """Add or remove the :OpenJourney label to match the current status of the given journeys."""
+    if journey_ids:
+        tx.run(SYNC_OPEN_LABEL_STATEMENT, journeyIds=journey_ids, openStatuses=OPEN_STATUSES).consume()
+
+
+def create_indexes(session) -> None:
+    """Create the indexes the top-K query depends on."""
+    for statement in CREATE_INDEX_STATEMENTS:
+        session.run(statement).consume()
+    session.run("CALL db.awaitIndexes(300)").consume()
+
+
+def rebuild(session) -> None:
+    """Create the indexes and relabel every journey from its status."""
+    create_indexes(session)
+    for statement in REBUILD_STATEMENTS:
+        session.run(statement, openStatuses=OPEN_STATUSES).consume()
+    count = session.run("MATCH (j:OpenJourney) RETURN count(j) AS c").single()["c"]
+    logging.info(f"{count} journeys labelled :OpenJourney")
+
+
+def seed(session, articles: int, batch_size: int = 50000) -> None:
+    """Create a synthetic Article/Journey graph tagged :BenchData."""
+    for start in range(1, articles + 1, batch_size):
+        end = min(start + batch_size - 1, articles)
+        session.run(SEED_STATEMENT, start=start, end=end).consume()
+        logging.info(f"Seeded articles {start}-{end}")
+
+
+def profile_db_hits(session, query: str, params: Dict) -> int:
+    """Return the total db hits of a PROFILEd query."""
+    summary = session.run("PROFILE " + query, **params).consume()
+
+    def total(plan) -> int:
+        return plan.get("dbHits", 0) + sum(total(child) for child in plan.get("children", []))
+
+    return total(summary.profile)
+
+
+def time_query(session, query: str, params: Dict, repeats: int) -> List[float]:
+    """Run a query repeatedly and return the wall times in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        session.run(query, **params).consume()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def benchmark(session, limit_count: int, repeats: int) -> None:
+    """Compare the full-sort query with the top-K index query."""
+    params = {"limit_count": limit_count}
+    journeys = session.run("MATCH (j:Journey) RETURN count(j) AS c").single()["c"]
+    print(f"Journeys in graph: {journeys}, K = {limit_count}, {repeats} runs each")
+    print(f"{'query':<12}{'median ms':>12}{'p95 ms':>12}{'db hits':>14}")
+    for name, query in [("full sort", FULL_SORT_QUERY), ("top-K index", TOP_K_QUERY)]:
+        session.run(query, **params).consume()  # warm up the plan cache
+        timings = sorted(time_query(session, query, params, repeats))
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:<12}{statistics.median(timings):>12.1f}{p95:>12.1f}{profile_db_hits(session, query, params):>14}")
+
+
+def main():
+    """Rebuild the open journey index or benchmark it."""
+    parser = argparse.ArgumentParser(description="Maintain and benchmark the open journey top-K index.")
+    parser.add_argument("command", choices=["rebuild", "benchmark"])
+    parser.add_argument("--tools-file", default=TOOLS_FILE, help="toolbox tools.yaml with the dnm-graph source")
+    parser.add_argument("--source", default="dnm-graph", help="Neo4j source name in the tools file")
+    parser.add_argument("--database", help="Override the database; required for benchmark, which seeds synthetic data")
+    parser.add_argument("--articles", type=int, default=0, help="benchmark: seed this many synthetic articles first")
+    parser.add_argument("--limit", type=int, default=5, help="benchmark: K")
+    parser.add_argument("--repeats", type=int, default=20, help="benchmark: runs per query")
+    parser.add_argument("--cleanup", action="store_true", help="benchmark: delete the synthetic articles afterwards")
+    args = parser.parse_args()
+
+    driver, database = get_driver(args.tools_file, args.source)
+    if args.command == "benchmark" and args.database in (None, database):
+        driver.close()
+        parser.error(f"benchmark writes synthetic BENCH- articles; pass --database with a scratch database "
+                     f"other than the source database '{database}'")
+    try:
+        with driver.session(database=args.database or database) as session:
+            if args.command == "rebuild":
+                rebuild(session)
+                return
+
+            if args.articles:
+                seed(session, args.articles)
+            rebuild(session)
+            benchmark(session, args.limit, args.repeats)
+            if args.cleanup:
+                session.run(CLEANUP_STATEMENT).consume()
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Streaming ingestion of facility scan events into the DNM graph.
+
+Scan events are JSON lines:
+    {"eventId": "E-1", "articleId": "ART-1", "eventType": "ARRIVAL", "facilityId": "FAC1",
+     "timestamp": "2025-03-01T10:00:00Z"}
+    {"eventId": "E-2", "articleId": "ART-1", "eventType": "DEPARTURE", "toFacilityId": "FAC7",
+     "timestamp": "2025-03-01T14:00:00Z"}
+    {"eventId": "E-3", "articleId": "ART-1", "eventType": "DELIVERY", "timestamp": "..."}
+
+- ARRIVAL appends an ArticleVisit, links it from the previous visit with NEXT_VISIT (transitTime),
+  moves LAST_FACILITY_VISIT and sets the journey status to 'F'.
+- DEPARTURE closes the last visit (lastScan, dwellTime), puts the article on the container to
+  toFacilityId and sets the status to 'T'. A visit leaves on one container: a DEPARTURE for a visit
+  that is already on a container (e.g. a replay with new event ids) is skipped.
+- DELIVERY closes the last visit and sets the status to 'D'.
+
+Events are micro-batched into UNWIND statements. Each journey remembers the timestamp and key of the
+last event applied to it, so replayed or out-of-order events are skipped and the upserts are idempotent.
+Events of one article with the same timestamp are ordered by the optional per-article "seq" field,
+otherwise ARRIVAL, DEPARTURE, DELIVERY. Events naming a facility that is not in the graph are rejected.
+The facility load counters and :OpenJourney labels are updated in the same transaction.
+A bounded queue between the reader and the writer provides backpressure: the reader blocks
+when the writer falls behind.
+
+Usage (from the repository root):
+    python -m dnm_conversations.dnm_utils.scan_ingest --input events.jsonl
+    tail -f events.jsonl | python -m dnm_conversations.dnm_utils.scan_ingest --input -
+    python -m dnm_conversations.dnm_utils.scan_ingest --benchmark 100000 --database bench
+"""
+
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List
+
+from toolbox_utils.neo4j_source import get_driver
+from .facility_load import apply_load_deltas
+from .open_journeys import sync_open_labels
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLS_FILE = "dnm_conversations/tools.yaml"
+
+# Marks the end of the stream on the queue
+_END = object()
+
+ARRIVAL_STATEMENT = """
+UNWIND $events AS e
+MATCH (f:Facility {facilityId: e.facilityId})
+MERGE (a:Article {articleId: e.articleId})
+ON CREATE SET a.articleName = e.articleId, a.createDate = datetime(e.timestamp), a.fromFacilityId = e.facilityId
+MERGE (j:Journey {journeyId: e.articleId})
+MERGE (a)-[:HAS_JOURNEY]->(j)
+WITH e, f, j
+WHERE j.lastEventAt IS NULL OR datetime(e.timestamp) > j.lastEventAt
+   OR (datetime(e.timestamp) = j.lastEventAt AND e.eventKey > coalesce(j.lastEventKey, ''))
+OPTIONAL MATCH (j)-[oldLast:LAST_FACILITY_VISIT]->(prev:ArticleVisit)
+OPTIONAL MATCH (prev)-[:TRANSPORTED_BY]->(oc:Container)
+WITH e, f, j, oldLast, prev, j.articleStatus AS oldStatus, head(collect(oc.toFacilityId)) AS oldInbound
+MERGE (v:ArticleVisit {visitId: 'V-' + e.eventId})
+SET v.facilityId = e.facilityId,
+    v.entryDate = datetime(e.timestamp),
+    v.seq = CASE WHEN prev IS NULL THEN 0 ELSE prev.seq + 1 END
+MERGE (v)-[:AT_FACILITY]->(f)
+MERGE (j)-[:INCLUDES_VISIT]->(v)
+FOREACH (_ IN CASE WHEN prev IS NULL THEN [1] ELSE [] END | MERGE (j)-[:FIRST_FACILITY_VISIT]->(v))
+FOREACH (_ IN CASE WHEN prev IS NULL THEN [] ELSE [1] END |
+  MERGE (prev)-[r:NEXT_VISIT]->(v)
+  SET r.transitTime = duration.inSeconds(coalesce(prev.lastScan, prev.entryDate), v.entryDate).minutes
+)
+DELETE oldLast
+MERGE (j)-[:LAST_FACILITY_VISIT]->(v)
+WITH e, j, v, prev, oldStatus, oldInbound
+MATCH (j)-[:FIRST_FACILITY_VISIT]->(first:ArticleVisit)
+SET j.articleStatus = 'F',
+    j.lastEventAt = datetime(e.timestamp),
+    j.lastEventKey = e.eventKey,
+    j.journeyTime = duration.inSeconds(first.entryDate, v.entryDate).minutes
+RETURN j.journeyId AS journeyId,
+       oldStatus, prev.facilityId AS oldFacilityId, oldInbound AS oldInboundFacilityId,
+       'F' AS newStatus, e.facilityId AS newFacilityId, null AS newInboundFacilityId
+"""
+
+DEPARTURE_STATEMENT = """
+UNWIND $events AS e
+MATCH (j:Journey {journeyId: e.articleId})
+WHERE j.lastEventAt IS NULL OR datetime(e.timestamp) > j.lastEventAt
+   OR (datetime(e.timestamp) = j.lastEventAt AND e.eventKey > coalesce(j.lastEventKey, ''))
+MATCH (j)-[:LAST_FACILITY_VISIT]->(v:ArticleVisit)
+MATCH (j)-[:FIRST_FACILITY_VISIT]->(first:ArticleVisit)
+WHERE NOT (v)-[:TRANSPORTED_BY]->(:Container)
+WITH e, j, v, first, j.articleStatus AS oldStatus
+SET v.lastScan = datetime(e.timestamp),
+    v.dwellTime = duration.inSeconds(v.entryDate, datetime(e.timestamp)).minutes,
+    j.articleStatus = 'T',
+    j.lastEventAt = datetime(e.timestamp),
+    j.lastEventKey = e.eventKey,
+    j.journeyTime = duration.inSeconds(first.entryDate, datetime(e.timestamp)).minutes
+MERGE (c:Container {containerId: coalesce(e.containerId, v.facilityId + '_' + e.toFacilityId)})
+ON CREATE SET c.fromFacilityId = v.facilityId, c.toFacilityId = e.toFacilityId
+MERGE (v)-[:TRANSPORTED_BY]->(c)
+RETURN j.journeyId AS journeyId,
+       oldStatus, v.facilityId AS oldFacilityId, null AS oldInboundFacilityId,
+       'T' AS newStatus, v.facilityId AS newFacilityId, c.toFacilityId AS newInboundFacilityId
+"""
+
+DELIVERY_STATEMENT = """
+UNWIND $events AS e
+MATCH (j:Journey {journeyId: e.articleId})
+WHERE j.lastEventAt IS NULL OR datetime(e.timestamp) > j.lastEventAt
+   OR (datetime(e.timestamp) = j.lastEventAt AND e.eventKey > coalesce(j.lastEventKey, ''))
+MATCH (j)-[:LAST_FACILITY_VISIT]->(v:ArticleVisit)
+MATCH (j)-[:FIRST_FACILITY_VISIT]->(first:ArticleVisit)
+OPTIONAL MATCH (v)-[:TRANSPORTED_BY]->(oc:Container)
+WITH e, j, v, first, j.articleStatus AS oldStatus, head(collect(oc.toFacilityId)) AS oldInbound
+SET v.lastScan = datetime(e.timestamp),
+    v.dwellTime = duration.inSeconds(v.entryDate, datetime(e.timestamp)).minutes,
+    j.articleStatus = 'D',
+    j.lastEventAt = datetime(e.timestamp),
+    j.lastEventKey = e.eventKey,
+    j.journeyTime = duration.inSeconds(first.entryDate, datetime(e.timestamp)).minutes
+RETURN j.journeyId AS journeyId,
+       oldStatus, v.facilityId AS oldFacilityId, oldInbound AS oldInboundFacilityId,
+       'D' AS newStatus, v.facilityId AS newFacilityId, null AS newInboundFacilityId
+"""
+
+KNOWN_FACILITIES_STATEMENT = """
+UNWIND $facilityIds AS facilityId
+MATCH (f:Facility {facilityId: facilityId})
+RETURN collect(facilityId) AS known
+"""
+
+STATEMENTS = {
+    "ARRIVAL": ARRIVAL_STATEMENT,
+    "DEPARTURE": DEPARTURE_STATEMENT,
+    "DELIVERY": DELIVERY_STATEMENT,
+}
+
+REQUIRED_FIELDS = {
+    "ARRIVAL": ("eventId", "articleId", "facilityId", "timestamp"),
+    "DEPARTURE": ("eventId", "articleId", "toFacilityId", "timestamp"),
+    "DELIVERY": ("eventId", "articleId", "timestamp"),
+}
+
+
+# Order of events of one article with the same timestamp when the feed gives no 'seq'
+EVENT_TYPE_ORDER = {"ARRIVAL": 0, "DEPARTURE": 1, "DELIVERY": 2}
+
+
+def validate_event(event: Dict) -> bool:
+    """Check an event has a known type and the fields that type needs."""
+    fields = REQUIRED_FIELDS.get(event.get("eventType"))
+    return fields is not None and all(event.get(field) for field in fields)
+
+
+def event_key(event: Dict) -> str:
+    """
+    Tie-breaker for events of one article with the same timestamp: the feed's per-article 'seq'
+    if it has one, otherwise the event type order, then the eventId. A replayed event has the same
+    key as when it was applied and is skipped.
+    """
+    if isinstance(event.get("seq"), int):
+        return f"{event['seq']:012d}:{event['eventId']}"
+    return f"{EVENT_TYPE_ORDER[event['eventType']]:012d}:{event['eventId']}"
+
+
+def event_facility(event: Dict):
+    return event.get("facilityId") if event["eventType"] == "ARRIVAL" else event.get("toFacilityId")
+
+
+def split_waves(events: List[Dict]) -> List[List[Dict]]:
+    """
+    Split a micro-batch so that each article appears at most once per wave.
+    Events of one article stay in arrival order across waves.
+    """
+    waves: List[List[Dict]] = []
+    seen_per_article: Dict[str, int] = {}
+    for event in events:
+        index = seen_per_article.get(event["articleId"], 0)
+        seen_per_article[event["articleId"]] = index + 1
+        if index == len(waves):
+            waves.append([])
+        waves[index].append(event)
+    return waves
+
+
+class ScanIngestor:
+    """Micro-batches scan events from a bounded queue into the graph."""
+
+    def __init__(self, session, batch_size: int = 1000, flush_interval: float = 0.5, max_pending: int = 10000):
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self.applied = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def submit(self, event: Dict) -> None:
+        """Queue one event. Blocks while the queue is full (backpressure)."""
+        self.queue.put(event)
+
+    def close(self) -> None:
+        """Signal the end of the stream."""
+        self.queue.put(_END)
+
+    def _write_batch(self, tx, events: List[Dict]) -> tuple:
+        # Events naming a facility that is not in the graph would leave orphan journeys; reject them
+        facility_ids = list({event_facility(e) for e in events} - {None})
+        known = set(tx.run(KNOWN_FACILITIES_STATEMENT, facilityIds=facility_ids).single()["known"])
+        accepted = [e for e in events if event_facility(e) in known or event_facility(e) is None]
+        for event in events:
+            if event_facility(event) not in known and event_facility(event) is not None:
+                logging.warning(f"Rejected {event['eventType']} {event['eventId']}: unknown facility {event_facility(event)}")
+
+        changes = []
+        for wave in split_waves(accepted):
+            for event_type, statement in STATEMENTS.items():
+                rows = [e for e in wave if e["eventType"] == event_type]
+                if rows:
+                    changes.extend(record.data() for record in tx.run(statement, events=rows))
+        apply_load_deltas(tx, changes)
+        sync_open_labels(tx, list({change["journeyId"] for change in changes}))
+        return len(changes), len(events) - len(accepted)
+
+    def flush(self, events: List[Dict]) -> None:
+        valid = [{**e, "eventKey": event_key(e)} for e in events if validate_event(e)]
+        self.invalid += len(events) - len(valid)
+        if not valid:
+            return
+        applied, rejected = self.session.execute_write(self._write_batch, valid)
+        self.applied += applied
+        self.rejected += rejected
+        self.skipped += len(valid) - applied - rejected
+        self.batches += 1
+
+    def run(self) -> None:
+        """Consume the queue until close() is called, flushing on size or interval."""
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _END:
+                self.flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self.flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+
+def read_events(source) -> Iterator[Dict]:
+    """Read JSON line events from a file object, skipping blank or malformed lines."""
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logging.warning(f"Skipping malformed event: {line[:200]}")
+
+
+def synthetic_events(articles: int, facilities: int, seed: int, active: int = 1000) -> Iterator[Dict]:
+    """
+    Generate interleaved scan events for new articles, as a stand-in for a live feed.
+    Each article arrives at 3-6 facilities with a departure between them, then is delivered.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    counter = 0
+    next_article = 1
+    in_flight: List[Dict] = []
+
+    def event(article, event_type, **fields):
+        nonlocal counter
+        counter += 1
+        article["clock"] += timedelta(minutes=rng.randrange(30, 600))
+        return {"eventId": f"BENCH-E-{counter}", "articleId": article["articleId"], "eventType": event_type,
+                "timestamp": article["clock"].strftime("%Y-%m-%dT%H:%M:%SZ"), **fields}
+
+    while in_flight or next_article <= articles:
+        while len(in_flight) < active and next_article <= articles:
+            route = [f"FAC{i}" for i in rng.sample(range(1, facilities + 1), min(facilities, rng.randrange(3, 7)))]
+            in_flight.append({"articleId": f"BENCH-{next_article}", "route": route, "step": 0,
+                              "clock": start + timedelta(days=rng.randrange(364))})
+            next_article += 1
+        article = in_flight[rng.randrange(len(in_flight))]
+        step, route = article["step"], article["route"]
+        stop = step // 2
+        if step % 2 == 0:
+            yield event(article, "ARRIVAL", facilityId=route[stop])
+        elif stop + 1 < len(route):
+            yield event(article, "DEPARTURE", toFacilityId=route[stop + 1])
+        else:
+            yield event(article, "DELIVERY")
+            in_flight.remove(article)
+        article["step"] += 1
+
+
+def ingest(session, events: Iterable[Dict], batch_size: int, flush_interval: float, max_pending: int) -> ScanIngestor:
+    """Feed events through the ingestor from a reader thread and wait for the writer to finish."""
+    ingestor = ScanIngestor(session, batch_size, flush_interval, max_pending)
+
+    def produce():
+        for event in events:
+            ingestor.submit(event)
+        ingestor.close()
+
+    reader = threading.Thread(target=produce, name="scan-reader", daemon=True)
+    reader.start()
+    ingestor.run()
+    reader.join()
+    return ingestor
+
+
+def main():
+    """Ingest scan events from a file, stdin or the synthetic benchmark feed."""
+    parser = argparse.ArgumentParser(description="Ingest facility scan events into the DNM graph.")
+    parser.add_argument("--input", help="JSON lines file of scan events, '-' for stdin")
+    parser.add_argument("--benchmark", type=int, metavar="ARTICLES",
+                        help="ingest synthetic events for this many new articles and report events/s")
+    parser.add_argument("--facilities", type=int, default=50, help="benchmark: facilities FAC1..FACn to route over")
+    parser.add_argument("--seed", type=int, default=42, help="benchmark: random seed")
+    parser.add_argument("--batch-size", type=int, default=1000, help="events per transaction")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="seconds before a partial batch is flushed")
+    parser.add_argument("--max-pending", type=int, default=10000, help="queued events before the reader blocks")
+    parser.add_argument("--tools-file", default=TOOLS_FILE, help="toolbox tools.yaml with the dnm-graph source")
+    parser.add_argument("--source", default="dnm-graph", help="Neo4j source name in the tools file")
+    parser.add_argument("--database", help="Override the database; required for --benchmark, which writes synthetic data")
+    args = parser.parse_args()
+
+    if bool(args.input) == bool(args.benchmark):
+        parser.error("pass exactly one of --input or --benchmark")
+
+    driver, database = get_driver(args.tools_file, args.source)
+    if args.benchmark and args.database in (None, database):
+        driver.close()
+        parser.error(f"--benchmark writes synthetic BENCH- articles; pass --database with a scratch database "
+                     f"other than the source database '{database}'")
+    source = None
+    try:
+        if args.benchmark:
+            events = synthetic_events(args.benchmark, args.facilities, args.seed)
+        else:
+            source = sys.stdin if args.input == "-" else open(args.input)
+            events = read_events(source)
+
+        with driver.session(database=args.database or database) as session:
+            start = time.perf_counter()
+            ingestor = ingest(session, events, args.batch_size, args.flush_interval, args.max_pending)
+            elapsed = time.perf_counter() - start
+
+        total = ingestor.applied + ingestor.skipped + ingestor.rejected + ingestor.invalid
+        print(f"Events: {total} in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} events/s), "
+              f"{ingestor.batches} batches")
+        print(f"Applied: {ingestor.applied}, skipped (replayed/out of order/unknown article): {ingestor.skipped}, "
+              f"rejected (unknown facility): {ingestor.rejected}, invalid: {ingestor.invalid}")
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Columnar snapshot export of the DNM graph.
+
+Streams Facilities, Journeys (with their Article), and ArticleVisits (with the outgoing NEXT_VISIT
+transit time) out of Neo4j into Arrow IPC files. The files are uncompressed so dwell_analytics can
+memory-map them without copying. Use --format parquet for smaller files to ship elsewhere.
+
+Usage (from the repository root):
+    python -m dnm_conversations.dnm_utils.snapshot_export
+    python -m dnm_conversations.dnm_utils.snapshot_export --out /data/dnm-snapshot --format parquet
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:
+    print(f"Error: pyarrow library not found: {e}")
+    print("Please install it with: pip install pyarrow")
+    sys.exit(1)
+
+from toolbox_utils.neo4j_source import get_driver
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLS_FILE = "dnm_conversations/tools.yaml"
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "snapshot")
+
+TABLES = {
+    "facilities": {
+        "query": """
+            MATCH (f:Facility)
+            OPTIONAL MATCH (f)-[:BELONGS_TO]->(s:State)
+            RETURN f.facilityId AS facilityId, f.facilityName AS facilityName, s.stateId AS stateId
+        """,
+        "schema": pa.schema([
+            ("facilityId", pa.string()),
+            ("facilityName", pa.string()),
+            ("stateId", pa.string()),
+        ]),
+    },
+    "journeys": {
+        "query": """
+            MATCH (a:Article)-[:HAS_JOURNEY]->(j:Journey)
+            RETURN a.articleId AS articleId, j.articleStatus AS articleStatus, j.journeyTime AS journeyTime,
+                   a.fromState AS fromState, a.toState AS toState,
+                   a.fromFacilityId AS fromFacilityId, a.toFacilityId AS toFacilityId,
+                   a.createDate.epochMillis AS createDate
+        """,
+        "schema": pa.schema([
+            ("articleId", pa.string()),
+            ("articleStatus", pa.string()),
+            ("journeyTime", pa.int64()),
+            ("fromState", pa.string()),
+            ("toState", pa.string()),
+            ("fromFacilityId", pa.string()),
+            ("toFacilityId", pa.string()),
+            ("createDate", pa.timestamp("ms", tz="UTC")),
+        ]),
+    },
+    "visits": {
+        "query": """
+            MATCH (a:Article)-[:HAS_JOURNEY]->(j:Journey)-[:INCLUDES_VISIT]->(v:ArticleVisit)
+            OPTIONAL MATCH (v)-[r:NEXT_VISIT]->(n:ArticleVisit)
+            RETURN a.articleId AS articleId, j.articleStatus AS articleStatus, v.facilityId AS facilityId,
+                   v.seq AS seq, v.entryDate.epochMillis AS entryDate, v.dwellTime AS dwellTime,
+                   r.transitTime AS transitTime, n.facilityId AS nextFacilityId
+        """,
+        "schema": pa.schema([
+            ("articleId", pa.string()),
+            ("articleStatus", pa.string()),
+            ("facilityId", pa.string()),
+            ("seq", pa.int32()),
+            ("entryDate", pa.timestamp("ms", tz="UTC")),
+            ("dwellTime", pa.int64()),
+            ("transitTime", pa.int64()),
+            ("nextFacilityId", pa.string()),
+        ]),
+    },
+}
+
+
+class _TableWriter:
+    """Writes record batches to an Arrow IPC or Parquet file."""
+
+    def __init__(self, path: str, schema: "pa.Schema", file_format: str):
+        self.schema = schema
+        if file_format == "parquet":
+            self.writer = pq.ParquetWriter(path, schema)
+        else:
+            self.sink = pa.OSFile(path, "wb")
+            self.writer = pa.ipc.new_file(self.sink, schema)
+        self.file_format = file_format
+
+    def write(self, rows: List[Dict]) -> None:
+        self.writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+        if self.file_format != "parquet":
+            self.sink.close()
+
+
+def export_table(session, name: str, out_dir: str, file_format: str, batch_size: int) -> int:
+    """Stream one query result into a columnar file. Returns the number of rows written."""
+    spec = TABLES[name]
+    extension = "parquet" if file_format == "parquet" else "arrow"
+    path = os.path.join(out_dir, f"{name}.{extension}")
+    tmp_path = path + ".tmp"
+    writer = _TableWriter(tmp_path, spec["schema"], file_format)
+    rows, count = [], 0
+    try:
+        for record in session.run(spec["query"]):
+            rows.append(record.data())
+            if len(rows) >= batch_size:
+                writer.write(rows)
+                count += len(rows)
+                rows = []
+        if rows:
+            writer.write(rows)
+            count += len(rows)
+    finally:
+        writer.close()
+    # Swap in the new file in one step so readers never see a partial snapshot table
+    os.replace(tmp_path, path)
+    logging.info(f"Exported {count} rows to {path}")
+    return count
+
+
+def export_snapshot(session, out_dir: str, file_format: str = "arrow", batch_size: int = 100000) -> Dict:
+    """Export all tables and write a manifest describing the snapshot."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {name: export_table(session, name, out_dir, file_format, batch_size) for name in TABLES}
+    manifest = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "format": file_format,
+        "rows": counts,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    """Export a columnar snapshot of the DNM graph."""
+    parser = argparse.ArgumentParser(description="Export a columnar snapshot of the DNM graph.")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="output directory")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    parser.add_argument("--batch-size", type=int, default=100000, help="rows per record batch")
+    parser.add_argument("--tools-file", default=TOOLS_FILE, help="toolbox tools.yaml with the dnm-graph source")
+    parser.add_argument("--source", default="dnm-graph", help="Neo4j source name in the tools file")
+    args = parser.parse_args()
+
+    driver, database = get_driver(args.tools_file, args.source)
+    try:
+        with driver.session(database=database) as session:
+            manifest = export_snapshot(session, args.out, args.format, args.batch_size)
+        print(f"Snapshot written to {args.out}: {manifest['rows']}")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 from google.adk import Agent
 from google.adk.apps import App
-from toolbox_core import ToolboxSyncClient
 
-client = ToolboxSyncClient("http://127.0.0.1:5001")
+from agent_utils.history_compaction import HistoryCompactor
+from agent_utils.parallel_tools import parallel_tools
+from agent_utils.toolbox_toolset import ToolboxToolset
+
+# Loaded on first use, so importing this module starts no toolbox client thread (safe to fork)
+toolset = ToolboxToolset("http://127.0.0.1:5001", wrap=parallel_tools)
+
+# Article content and company lists are large; keep only summaries of stale results in the history
+history_compactor = HistoryCompactor(token_budget=4000, keep_recent_turns=2)
 
 root_agent = Agent(
     name='root_agent',
     model='gemini-2.5-flash',
-    instruction="You are a helpful AI assistant designed to provide accurate and useful information.",
-    tools=client.load_toolset(),
+    instruction="You are a helpful AI assistant designed to provide accurate and useful information. "
+                "Older tool results may be shortened to a summary with a 'ref'; call 'recall_tool_result' "
+                "with that ref only if you need the full result again. "
+                "When you need the same tool for several companies or articles, request all of those calls "
+                "in the same turn; they run in parallel.",
+    tools=[toolset, history_compactor.recall_tool_result],
+    before_model_callback=history_compactor,
 )
 
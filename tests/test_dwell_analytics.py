@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from dnm_conversations.dnm_utils.dwell_analytics import DwellAnalytics, grouped_percentiles, MS_PER_DAY
+
+
+def test_grouped_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    groups = rng.integers(-1, 6, size=500)
+    values = rng.normal(50, 40, size=500).round(1)  # negative and fractional values
+    values[rng.integers(0, 500, size=20)] = np.nan
+    percentiles = (0, 25, 50, 90, 99, 100)
+
+    keys, counts, means, result = grouped_percentiles(groups, values, percentiles)
+
+    for key, count, mean, row in zip(keys, counts, means, result):
+        expected = values[(groups == key) & ~np.isnan(values)]
+        assert count == len(expected)
+        assert mean == pytest.approx(expected.mean())
+        assert row == pytest.approx(np.percentile(expected, percentiles))
+    assert -1 not in keys
+
+
+def test_grouped_percentiles_single_value_and_empty():
+    keys, counts, _, result = grouped_percentiles(np.array([3, 3, -1]), np.array([7.5, 7.5, 1.0]), (50, 90))
+    assert keys.tolist() == [3] and counts.tolist() == [2]
+    assert result.tolist() == [[7.5, 7.5]]
+    assert len(grouped_percentiles(np.array([-1]), np.array([1.0]), (50,))[0]) == 0
+
+
+def test_dwell_trend_skips_visits_without_entry_date(tmp_path):
+    (tmp_path / "manifest.json").write_text(json.dumps({"createdAt": "2026-01-01T00:00:00"}))
+    pq.write_table(pa.table({"facilityId": ["FAC1"], "facilityName": ["Facility 1 VIC"], "stateId": ["VIC"]}),
+                   tmp_path / "facilities.parquet")
+    entry = pa.array([0, MS_PER_DAY, None], pa.int64()).cast(pa.timestamp("ms"))
+    pq.write_table(pa.table({
+        "facilityId": ["FAC1"] * 3,
+        "nextFacilityId": pa.array([None] * 3, pa.string()),
+        "articleStatus": ["F", "D", "D"],
+        "dwellTime": [10.0, 20.0, 30.0],
+        "transitTime": pa.array([None] * 3, pa.float64()),
+        "entryDate": entry,
+    }), tmp_path / "visits.parquet")
+
+    trend = DwellAnalytics(str(tmp_path)).dwell_trend("FAC1", window_days=7, periods=2)
+    assert [row["visits"] for row in trend] == [2]
+    assert trend[0]["p50"] == 15.0
@@ -0,0 +1,65 @@
+import pytest
+
+from dnm_conversations.dnm_utils.facility_resolver import FacilityResolver, resolving_facilities
+
+CATALOG = [
+    {"facilityId": "FAC1", "facilityName": "Facility 1 VIC", "stateId": "VIC", "stateName": "Victoria"},
+    {"facilityId": "FAC2", "facilityName": "Facility 2 NSW", "stateId": "NSW", "stateName": "New South Wales"},
+    {"facilityId": "FAC12", "facilityName": "Facility 12 QLD", "stateId": "QLD", "stateName": "Queensland"},
+]
+
+
+def resolver(load_catalog=lambda: CATALOG):
+    return FacilityResolver(load_catalog, refresh_interval=0)
+
+
+def test_exact():
+    assert resolver().resolve("FAC2")["facilityId"] == "FAC2"
+    assert resolver().resolve("Facility 1 (VIC)") == {**CATALOG[0], "match": "exact"}
+
+
+def test_fuzzy():
+    match = resolver().resolve("facilty 12")
+    assert (match["facilityId"], match["match"]) == ("FAC12", "fuzzy")
+
+
+def test_state_mismatch():
+    with pytest.raises(LookupError, match="in NSW; .*in another state"):
+        resolver().resolve("facility 1 (nsw)")
+    assert resolver().resolve("facility 2 new south wales")["facilityId"] == "FAC2"
+
+
+def test_unknown_facility():
+    with pytest.raises(LookupError, match="No facility matches"):
+        resolver().resolve("warehouse zzz")
+
+
+def test_loader_failure_passes_the_value_through():
+    def unavailable():
+        raise ConnectionError("database unavailable")
+
+    def tool(facilityId: str):
+        return [facilityId]
+
+    wrapped = resolving_facilities(tool, resolver(unavailable), ["facilityId"])
+    assert wrapped(facilityId="FAC1") == ["FAC1"]
+
+
+def test_loader_failure_keeps_the_last_catalog():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) > 1:
+            raise ConnectionError("database unavailable")
+        return CATALOG
+
+    flaky_resolver = resolver(flaky)
+    assert flaky_resolver.resolve("fac 1")["facilityId"] == "FAC1"
+    assert flaky_resolver.resolve("fac 2")["facilityId"] == "FAC2"
+    assert len(calls) == 2
+
+
+def test_wrapper_reports_lookup_errors():
+    wrapped = resolving_facilities(lambda facilityId: [facilityId], resolver(), ["facilityId"])
+    assert wrapped(facilityId="facility 1 nsw")["status"] == "error"
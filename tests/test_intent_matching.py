@@ -0,0 +1,65 @@
+import pytest
+
+from dnm_conversations.dnm_utils.intent_matching import match_question
+
+
+@pytest.mark.parametrize("question, tool, args", [
+    ("Is the network busy?", "check_network_congestion", {"threshold": 5}),
+    ("Any bottlenecks of more than 10 articles?", "check_network_congestion", {"threshold": 10}),
+    ("How many articles are in transit?", "summarize_articles_by_status", {"statusCode": "T"}),
+    ("How many articles have been delivered?", "summarize_articles_by_status", {"statusCode": "D"}),
+    ("How many parcels are in the warehouse?", "summarize_articles_by_status", {"statusCode": "F"}),
+    ("Where is ART-12?", "get_article_journey", {"articleId": "ART-12"}),
+    ("What are the 10 longest open journeys?", "get_longest_open_journeys", {"limit_count": 10}),
+    ("Which articles are at Facility 3?", "get_articles_dwelling_at_facility", {"facilityId": "facility 3"}),
+    ("Which articles are at FAC3 (VIC)?", "get_articles_dwelling_at_facility", {"facilityId": "fac3 (vic)"}),
+    ("Which articles are at facility 3 nsw?", "get_articles_dwelling_at_facility", {"facilityId": "facility 3 nsw"}),
+    ("Which articles are in transit to facility 4?", "get_intransit_articles_to_facility", {"facilityId": "facility 4"}),
+    ("How many articles are at facility 3?", "count_articles_at_facility", {"facilityId": "facility 3"}),
+])
+def test_routes(question, tool, args):
+    route = match_question(question)
+    assert route is not None
+    assert (route.tool, route.args) == (tool, args)
+
+
+@pytest.mark.parametrize("question", [
+    # negations
+    "How many undelivered articles are there?",
+    "How many articles have not been delivered?",
+    "How many articles haven't been delivered yet?",
+    # modifiers the templates cannot express
+    "How many articles were delivered late?",
+    "How many delivered articles arrived at Facility 3?",
+    "How many articles were delivered yesterday?",
+    "Show the articles at FAC10 page 2",
+    # more than one template
+    "Which items are stuck in transit to facility 4?",
+    "How many articles are delivered or in transit?",
+    # a single facility, not the network
+    "Is facility 3 congested?",
+    # state scopes
+    "Which facilities in NSW are congested?",
+    "Are there bottlenecks in VIC?",
+    "How many articles are in transit in VIC?",
+    "How many articles are in transit in new south wales?",
+    "What are the longest open journeys in VIC?",
+    # several facilities or articles
+    "How many articles are at facility 3 or facility 5?",
+    "Which articles are at facility 3 and facility 4?",
+    "Where is ART-12 and ART-13?",
+    "Which articles are in transit to facility 4 via facility 2?",
+    "Is the network congested with delivered articles?",
+    # no template
+    "What is the weather like?",
+    "How many articles are there?",
+])
+def test_falls_through(question):
+    assert match_question(question) is None
+
+
+def test_facility_needs_a_word_boundary_and_known_state():
+    assert match_question("Which articles are at FAC10 pag").args == {"facilityId": "fac10"}
+    assert match_question("Which articles are at FAC10 in abc?").args == {"facilityId": "fac10"}
+    assert match_question("Which articles are at facility 12?").args == {"facilityId": "facility 12"}
+    assert match_question("Which articles are at factory 12?") is None
@@ -0,0 +1,62 @@
+"""
+Runs against a scratch database of the dnm-graph source: set DNM_TEST_DATABASE to its name.
+The test only touches TEST- articles and facilities and removes them afterwards.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+DATABASE = os.getenv("DNM_TEST_DATABASE")
+pytestmark = pytest.mark.skipif(not DATABASE, reason="DNM_TEST_DATABASE is not set")
+
+SETUP = """
+UNWIND ['TEST-FAC1', 'TEST-FAC7', 'TEST-FAC8'] AS id
+MERGE (f:Facility {facilityId: id}) SET f.facilityName = id, f.dwellingCount = 0, f.inboundCount = 0
+"""
+CLEANUP = """
+MATCH (n) WHERE n.articleId = 'TEST-ART-1' OR n.journeyId = 'TEST-ART-1' OR n.visitId STARTS WITH 'V-TEST-'
+   OR (n:Facility AND n.facilityId STARTS WITH 'TEST-') OR n.containerId STARTS WITH 'TEST-'
+DETACH DELETE n
+"""
+CONTAINERS = """
+MATCH (:Journey {journeyId: 'TEST-ART-1'})-[:LAST_FACILITY_VISIT]->()-[t:TRANSPORTED_BY]->()
+RETURN count(t) AS links
+"""
+INBOUND = "MATCH (f:Facility) WHERE f.facilityId IN ['TEST-FAC7', 'TEST-FAC8'] RETURN f.facilityId AS id, f.inboundCount AS inbound"
+
+
+@pytest.fixture
+def session():
+    from toolbox_utils.neo4j_source import get_driver
+
+    driver, _ = get_driver("dnm_conversations/tools.yaml", "dnm-graph")
+    with driver.session(database=DATABASE) as session:
+        session.run(CLEANUP).consume()
+        session.run(SETUP).consume()
+        yield session
+        session.run(CLEANUP).consume()
+    driver.close()
+
+
+def test_replayed_departures_keep_one_container(session):
+    from dnm_conversations.dnm_utils.scan_ingest import ScanIngestor
+
+    wave = [
+        {"eventId": "TEST-E-1", "articleId": "TEST-ART-1", "eventType": "ARRIVAL", "facilityId": "TEST-FAC1",
+         "timestamp": "2025-03-01T10:00:00Z"},
+        {"eventId": "TEST-E-2", "articleId": "TEST-ART-1", "eventType": "DEPARTURE", "toFacilityId": "TEST-FAC7",
+         "containerId": "TEST-C-1", "timestamp": "2025-03-01T14:00:00Z"},
+    ]
+    ingestor = ScanIngestor(session)
+    ingestor.flush(wave)
+    ingestor.flush(wave)
+    # The same departure again under a new id and container, as some feeds resend it
+    ingestor.flush([{**wave[1], "eventId": "TEST-E-3", "containerId": "TEST-C-2", "toFacilityId": "TEST-FAC8",
+                     "timestamp": "2025-03-01T15:00:00Z"}])
+
+    assert ingestor.applied == 2
+    assert session.run(CONTAINERS).single()["links"] == 1
+    assert {r["id"]: r["inbound"] for r in session.run(INBOUND)} == {"TEST-FAC7": 1, "TEST-FAC8": 0}
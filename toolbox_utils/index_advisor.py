@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the neo4j-cypher statements in an MCP Toolbox tools.yaml file.
+
+For every neo4j-cypher tool the advisor:
+1. Runs EXPLAIN (or PROFILE with --profile) with sample parameters.
+2. Flags label scans, all-node scans, eager operators and cartesian products in the plan,
+   and predicates that wrap a property in a function (e.g. date(a.date)), which no index can serve.
+3. Matches the property predicates of the statement against the existing indexes and proposes the
+   missing range/text indexes for labels that are scanned.
+
+With --apply the missing indexes are created and every statement is PROFILEd before and after,
+so the report shows the db hits saved.
+
+Sample parameters come from the tool's default / allowedValues, a --params file
+({tool: {param: value}}) or a placeholder for the parameter type.
+
+Usage (from the repository root):
+    python -m toolbox_utils.index_advisor dnm_conversations/tools.yaml
+    python -m toolbox_utils.index_advisor dnm_conversations/tools.yaml --params params.yaml --emit indexes.cypher
+    python -m toolbox_utils.index_advisor dnm_conversations/tools.yaml --params params.yaml --apply
+"""
+
+import re
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from .neo4j_source import get_driver, load_tools_file
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+WARNING_OPERATORS = SCAN_OPERATORS | {"Eager", "CartesianProduct"}
+
+PLACEHOLDER_VALUES = {
+    "string": "",
+    "integer": 1,
+    "float": 1.0,
+    "boolean": False,
+    "array": [],
+}
+
+# (var:Label {prop: ..., prop2: ...})
+INLINE_PROPERTIES = re.compile(r"\(\s*(\w*)\s*:\s*(\w+)\s*\{([^}]*)\}")
+# (var:Label
+LABEL_BINDING = re.compile(r"\(\s*(\w+)\s*:\s*(\w+)")
+# var.prop = / < / > / STARTS WITH / CONTAINS / ENDS WITH / IN
+PROPERTY_PREDICATE = re.compile(
+    r"(?<![\w.(])(\w+)\.(\w+)\s*(=|<>|<=|>=|<|>|STARTS\s+WITH|ENDS\s+WITH|CONTAINS|IN\b)", re.IGNORECASE)
+# function(var.prop) compared with something
+WRAPPED_PREDICATE = re.compile(r"\b(\w+)\(\s*(\w+)\.(\w+)\s*\)\s*(=|<>|<=|>=|<|>)", re.IGNORECASE)
+
+EXISTING_INDEXES_QUERY = """
+SHOW INDEXES YIELD type, entityType, labelsOrTypes, properties
+WHERE entityType = 'NODE' AND labelsOrTypes IS NOT NULL
+RETURN type, labelsOrTypes, properties
+"""
+
+
+def sample_parameters(tool: Dict, overrides: Dict) -> Dict:
+    """Build one parameter value per declared tool parameter."""
+    params = {}
+    for param in tool.get("parameters") or []:
+        name = param["name"]
+        if name in overrides:
+            params[name] = overrides[name]
+        elif "default" in param:
+            params[name] = param["default"]
+        elif param.get("allowedValues"):
+            params[name] = param["allowedValues"][0]
+        else:
+            params[name] = PLACEHOLDER_VALUES.get(param.get("type"), None)
+    return params
+
+
+def property_predicates(statement: str) -> Tuple[Set[Tuple[str, str, str]], List[str]]:
+    """
+    Find the (label, property, index type) pairs the statement filters on, and the
+    predicates that wrap a property in a function.
+    """
+    labels = defaultdict(set)
+    for var, label in LABEL_BINDING.findall(statement):
+        labels[var].add(label)
+
+    predicates = set()
+    for _, label, body in INLINE_PROPERTIES.findall(statement):
+        for key in re.findall(r"(\w+)\s*:", body):
+            predicates.add((label, key, "RANGE"))
+    for var, prop, op in PROPERTY_PREDICATE.findall(statement):
+        index_type = "TEXT" if op.upper().replace(" ", "") in ("CONTAINS", "ENDSWITH") else "RANGE"
+        for label in labels.get(var, ()):
+            predicates.add((label, prop, index_type))
+
+    wrapped = [
+        f"{func}({var}.{prop}) {op} ... cannot use an index on {'/'.join(sorted(labels.get(var, {'?'})))}.{prop}; "
+        f"compare the stored property with a converted parameter instead"
+        for func, var, prop, op in WRAPPED_PREDICATE.findall(statement)
+    ]
+    return predicates, wrapped
+
+
+def plan_operators(plan) -> List[Tuple[str, str]]:
+    """Flatten a plan into (operator, details) pairs."""
+    operator = plan.get("operatorType", "").split("@")[0]
+    details = str((plan.get("arguments") or {}).get("Details", ""))
+    ops = [(operator, details)]
+    for child in plan.get("children", []):
+        ops.extend(plan_operators(child))
+    return ops
+
+
+def total_db_hits(plan) -> int:
+    """Sum the db hits of a PROFILE plan."""
+    return plan.get("dbHits", 0) + sum(total_db_hits(child) for child in plan.get("children", []))
+
+
+def existing_indexes(session) -> Set[Tuple[str, str, str]]:
+    """Return the single-property node indexes as (label, property, type)."""
+    indexes = set()
+    for record in session.run(EXISTING_INDEXES_QUERY):
+        if len(record["properties"] or []) == 1:
+            for label in record["labelsOrTypes"]:
+                indexes.add((label, record["properties"][0], record["type"]))
+    return indexes
+
+
+def index_statement(label: str, prop: str, index_type: str) -> str:
+    """Cypher that creates an index for a label/property."""
+    name = f"{label.lower()}_{prop.lower()}{'_text' if index_type == 'TEXT' else ''}"
+    kind = "TEXT INDEX" if index_type == "TEXT" else "INDEX"
+    return f"CREATE {kind} {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+
+
+def analyse_tool(session, name: str, tool: Dict, params: Dict, profile: bool, indexes: Set) -> Dict:
+    """EXPLAIN/PROFILE one tool statement and derive its missing indexes."""
+    statement = tool["statement"]
+    prefix = "PROFILE " if profile else "EXPLAIN "
+    result = {"tool": name, "warnings": [], "missing": set(), "dbHits": None, "error": None}
+    try:
+        summary = session.run(prefix + statement, **params).consume()
+    except Exception as e:
+        result["error"] = str(e).splitlines()[0]
+        return result
+
+    plan = summary.profile if profile else summary.plan
+    if profile:
+        result["dbHits"] = total_db_hits(plan)
+    operators = plan_operators(plan)
+    scanned_labels = set()
+    all_nodes_scan = False
+    for operator, details in operators:
+        if operator in WARNING_OPERATORS:
+            result["warnings"].append(f"{operator} {details}".strip())
+        if operator == "NodeByLabelScan":
+            scanned_labels.update(re.findall(r":(\w+)", details))
+        if operator == "AllNodesScan":
+            all_nodes_scan = True
+
+    predicates, wrapped = property_predicates(statement)
+    result["warnings"].extend(wrapped)
+    indexed = {(label, prop) for label, prop, index_type in indexes if index_type == "RANGE"}
+    text_indexed = {(label, prop) for label, prop, index_type in indexes if index_type == "TEXT"}
+    for label, prop, index_type in predicates:
+        if not all_nodes_scan and label not in scanned_labels:
+            continue
+        covered = (label, prop) in (text_indexed if index_type == "TEXT" else indexed)
+        if not covered:
+            result["missing"].add((label, prop, index_type))
+    return result
+
+
+def print_report(results: List[Dict], after: Optional[Dict[str, int]] = None) -> None:
+    """Print the findings per tool, with db hits before/after when available."""
+    for result in results:
+        print(f"\n== {result['tool']}")
+        if result["error"]:
+            print(f"  could not plan: {result['error']}")
+            continue
+        for warning in result["warnings"]:
+            print(f"  ! {warning}")
+        for label, prop, index_type in sorted(result["missing"]):
+            print(f"  + {index_statement(label, prop, index_type)}")
+        if not result["warnings"] and not result["missing"]:
+            print("  ok")
+
+    if any(r["dbHits"] is not None for r in results):
+        print(f"\n{'tool':<40}{'db hits before':>16}{'db hits after':>16}")
+        for result in results:
+            before = result["dbHits"]
+            after_hits = (after or {}).get(result["tool"])
+            print(f"{result['tool']:<40}{before if before is not None else '-':>16}"
+                  f"{after_hits if after_hits is not None else '-':>16}")
+
+
+def main():
+    """Analyse the statements of a tools.yaml file and propose or apply indexes."""
+    parser = argparse.ArgumentParser(description="Propose missing indexes for toolbox neo4j-cypher tools.")
+    parser.add_argument("tools_file", help="toolbox tools.yaml")
+    parser.add_argument("--params", help="yaml/json file of sample parameters: {tool: {param: value}}")
+    parser.add_argument("--profile", action="store_true", help="PROFILE instead of EXPLAIN to report db hits")
+    parser.add_argument("--emit", help="write the missing index statements to this file")
+    parser.add_argument("--apply", action="store_true", help="create the missing indexes and PROFILE again")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.params:
+        with open(args.params) as f:
+            overrides = yaml.safe_load(f) or {}
+
+    tools_by_source = defaultdict(dict)
+    for name, tool in (load_tools_file(args.tools_file).get("tools") or {}).items():
+        if tool.get("kind") == "neo4j-cypher":
+            tools_by_source[tool["source"]][name] = tool
+
+    all_missing = set()
+    for source, tools in tools_by_source.items():
+        driver, database = get_driver(args.tools_file, source)
+        try:
+            with driver.session(database=database) as session:
+                indexes = existing_indexes(session)
+                params = {name: sample_parameters(tool, overrides.get(name, {})) for name, tool in tools.items()}
+                profile = args.profile or args.apply
+                results = [
+                    analyse_tool(session, name, tool, params[name], profile, indexes)
+                    for name, tool in tools.items()
+                ]
+                missing = set().union(*(r["missing"] for r in results)) if results else set()
+                all_missing |= missing
+
+                after = None
+                if args.apply and missing:
+                    for label, prop, index_type in sorted(missing):
+                        statement = index_statement(label, prop, index_type)
+                        logging.info(statement)
+                        session.run(statement).consume()
+                    session.run("CALL db.awaitIndexes(300)").consume()
+                    after = {
+                        name: analyse_tool(session, name, tool, params[name], True, existing_indexes(session))["dbHits"]
+                        for name, tool in tools.items()
+                    }
+
+                print(f"\n######## source: {source} ({database})")
+                print_report(results, after)
+        finally:
+            driver.close()
+
+    if args.emit:
+        with open(args.emit, "w") as f:
+            for label, prop, index_type in sorted(all_missing):
+                f.write(index_statement(label, prop, index_type) + ";\n")
+        print(f"\nWrote {len(all_missing)} index statements to {args.emit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Workload replay load tester for MCP Toolbox tools.
+
+Reads a tools.yaml, builds a weighted mix of tool invocations and drives them against a running
+toolbox server, either at a fixed request rate (open loop) or with a fixed number of concurrent
+callers (closed loop). Reports per-tool throughput, latency percentiles and error rates, plus the
+server-side db hits of each neo4j-cypher statement (PROFILE with sampled parameters).
+
+The mix comes from a workload file, or every tool with weight 1:
+    tools:
+      check_network_congestion:
+        weight: 5
+      get_article_journey:
+        weight: 3
+        params:
+          articleId: {sample: "MATCH (a:Article) RETURN a.articleId AS value ORDER BY rand() LIMIT 500"}
+      get_articles_by_status:
+        params:
+          statusCode: {choices: [D, T, F]}
+          page_size: 25
+
+Parameters without a value use the tool's default / first allowed value. 'sample' queries run once
+against the tool's Neo4j source and the invocations draw from the results.
+A recorded log (--replay, JSON lines of {"tool": ..., "params": {...}}) can be replayed instead of the mix.
+
+Usage (from the repository root):
+    python -m toolbox_utils.load_tester dnm_conversations/tools.yaml --workload dnm_conversations/load_workload.yaml \
+        --rate 50 --duration 60 --output run.json
+    python -m toolbox_utils.load_tester dnm_conversations/tools.yaml --concurrency 16 --duration 60 --compare run.json
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import yaml
+from toolbox_core import ToolboxClient
+
+from .neo4j_source import get_driver, load_tools_file
+from .index_advisor import sample_parameters, total_db_hits
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TOOLBOX_URL = "http://127.0.0.1:5001"
+PERCENTILES = (50, 95, 99)
+# A run regresses when a tool's p95 latency grows by more than this fraction, or its error rate rises
+P95_REGRESSION = 0.20
+ERROR_RATE_REGRESSION = 0.01
+# db hits do not depend on load or timing, so a smaller change is already a plan regression
+DB_HITS_REGRESSION = 0.10
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Workload:
+    """Weighted tool mix with parameter generators."""
+
+    def __init__(self, tools_file: str, workload: Dict, seed: int):
+        self.rng = random.Random(seed)
+        self.tools = {
+            name: tool for name, tool in (load_tools_file(tools_file).get("tools") or {}).items()
+        }
+        mix = (workload or {}).get("tools") or {name: {} for name in self.tools}
+        unknown = set(mix) - set(self.tools)
+        if unknown:
+            raise ValueError(f"Workload names tools not in {tools_file}: {', '.join(sorted(unknown))}")
+        self.names = list(mix)
+        self.weights = [float((mix[name] or {}).get("weight", 1)) for name in self.names]
+        self.param_specs = {name: (mix[name] or {}).get("params") or {} for name in self.names}
+        self.samples: Dict[tuple, List] = {}
+        self.tools_file = tools_file
+
+    def load_samples(self) -> None:
+        """Run the 'sample' queries once against each tool's source."""
+        by_source = defaultdict(list)
+        for name in self.names:
+            for param, spec in self.param_specs[name].items():
+                if isinstance(spec, dict) and "sample" in spec:
+                    by_source[self.tools[name].get("source")].append((name, param, spec["sample"]))
+        for source, queries in by_source.items():
+            driver, database = get_driver(self.tools_file, source)
+            try:
+                with driver.session(database=database) as session:
+                    for name, param, query in queries:
+                        values = [record["value"] for record in session.run(query)]
+                        if not values:
+                            raise ValueError(f"Sample query for {name}.{param} returned no rows")
+                        self.samples[(name, param)] = values
+                        logging.info(f"Sampled {len(values)} values for {name}.{param}")
+            finally:
+                driver.close()
+
+    def params_for(self, name: str) -> Dict:
+        params = sample_parameters(self.tools[name], {})
+        for param, spec in self.param_specs[name].items():
+            if isinstance(spec, dict) and "sample" in spec:
+                params[param] = self.rng.choice(self.samples[(name, param)])
+            elif isinstance(spec, dict) and "choices" in spec:
+                params[param] = self.rng.choice(spec["choices"])
+            else:
+                params[param] = spec
+        return params
+
+    def next_call(self) -> Dict:
+        name = self.rng.choices(self.names, self.weights)[0]
+        return {"tool": name, "params": self.params_for(name)}
+
+
+class Replay:
+    """Cycles through a recorded invocation log."""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            self.calls = [json.loads(line) for line in f if line.strip()]
+        if not self.calls:
+            raise ValueError(f"No invocations in {path}")
+        self.position = 0
+
+    def next_call(self) -> Dict:
+        call = self.calls[self.position % len(self.calls)]
+        self.position += 1
+        return call
+
+
+class Recorder:
+    """Collects per-tool latencies and errors."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples: Dict[str, str] = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, tool: str, latency_ms: float, error: Optional[str]) -> None:
+        self.latencies[tool].append(latency_ms)
+        if error:
+            self.errors[tool] += 1
+            self.error_samples.setdefault(tool, error)
+
+    def summary(self) -> Dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        tools = {}
+        for tool, values in self.latencies.items():
+            ordered = sorted(values)
+            tools[tool] = {
+                "calls": len(values),
+                "throughput": round(len(values) / elapsed, 2),
+                "errorRate": round(self.errors[tool] / len(values), 4),
+                **{f"p{p}": round(percentile(ordered, p), 1) for p in PERCENTILES},
+                "maxMs": round(ordered[-1], 1),
+            }
+            if tool in self.error_samples:
+                tools[tool]["firstError"] = self.error_samples[tool]
+        total = sum(len(v) for v in self.latencies.values())
+        return {"durationSeconds": round(elapsed, 1), "calls": total,
+                "throughput": round(total / elapsed, 2) if elapsed else 0, "tools": tools}
+
+
+async def invoke(tools: Dict, recorder: Recorder, call: Dict, timeout: float) -> None:
+    start = time.perf_counter()
+    error = None
+    try:
+        await asyncio.wait_for(tools[call["tool"]](**call["params"]), timeout)
+    except asyncio.TimeoutError:
+        error = f"timeout after {timeout}s"
+    except Exception as e:
+        error = str(e).splitlines()[0] if str(e) else type(e).__name__
+    recorder.record(call["tool"], (time.perf_counter() - start) * 1000, error)
+
+
+async def run_load(source, url: str, rate: Optional[float], concurrency: Optional[int],
+                   duration: float, timeout: float) -> Recorder:
+    """Drive the toolbox at a fixed rate or concurrency for duration seconds."""
+    async with ToolboxClient(url) as client:
+        tools = {tool.__name__: tool for tool in await client.load_toolset()}
+        recorder = Recorder()
+        deadline = time.perf_counter() + duration
+
+        if rate:
+            # Open loop: start calls on schedule whether or not earlier calls have finished
+            pending = set()
+            interval = 1.0 / rate
+            next_start = time.perf_counter()
+            while next_start < deadline:
+                task = asyncio.create_task(invoke(tools, recorder, source.next_call(), timeout))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                next_start += interval
+                await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+            if pending:
+                await asyncio.wait(pending)
+        else:
+            # Closed loop: each worker issues its next call as soon as the previous one returns
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await invoke(tools, recorder, source.next_call(), timeout)
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        recorder.finished = time.perf_counter()
+        return recorder
+
+
+def profile_db_hits(tools_file: str, source, samples_per_tool: int = 5) -> Dict[str, float]:
+    """Average PROFILE db hits of each neo4j-cypher tool over a few sampled invocations."""
+    definitions = load_tools_file(tools_file).get("tools") or {}
+    calls = defaultdict(list)
+    for _ in range(samples_per_tool * 20):
+        call = source.next_call()
+        if definitions.get(call["tool"], {}).get("kind") == "neo4j-cypher" and \
+                len(calls[call["tool"]]) < samples_per_tool:
+            calls[call["tool"]].append(call["params"])
+
+    hits = {}
+    by_source = defaultdict(list)
+    for name in calls:
+        by_source[definitions[name]["source"]].append(name)
+    for source_name, names in by_source.items():
+        driver, database = get_driver(tools_file, source_name)
+        try:
+            with driver.session(database=database) as session:
+                for name in names:
+                    totals = []
+                    for params in calls[name]:
+                        try:
+                            summary = session.run("PROFILE " + definitions[name]["statement"], **params).consume()
+                            totals.append(total_db_hits(summary.profile))
+                        except Exception as e:
+                            logging.warning(f"PROFILE failed for {name}: {e}")
+                    if totals:
+                        hits[name] = round(sum(totals) / len(totals), 1)
+        finally:
+            driver.close()
+    return hits
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """Return a line per regressed tool."""
+    regressions = []
+    for tool, now in current["tools"].items():
+        before = baseline.get("tools", {}).get(tool)
+        if not before:
+            continue
+        if before.get("p95") and now["p95"] > before["p95"] * (1 + P95_REGRESSION):
+            regressions.append(f"{tool}: p95 {before['p95']} -> {now['p95']} ms")
+        if now["errorRate"] > before["errorRate"] + ERROR_RATE_REGRESSION:
+            regressions.append(f"{tool}: error rate {before['errorRate']:.2%} -> {now['errorRate']:.2%}")
+        before_hits, now_hits = before.get("dbHits"), now.get("dbHits")
+        if before_hits and now_hits and now_hits > before_hits * (1 + DB_HITS_REGRESSION):
+            regressions.append(f"{tool}: db hits {before_hits} -> {now_hits}")
+    return regressions
+
+
+def print_summary(summary: Dict, baseline: Optional[Dict] = None) -> None:
+    print(f"\n{summary['calls']} calls in {summary['durationSeconds']}s ({summary['throughput']} calls/s)")
+    print(f"{'tool':<38}{'calls':>7}{'/s':>8}{'err %':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'db hits':>10}"
+          + (f"{'base p95':>10}" if baseline else ""))
+    for tool, row in sorted(summary["tools"].items()):
+        line = (f"{tool:<38}{row['calls']:>7}{row['throughput']:>8}{row['errorRate'] * 100:>7.1f}"
+                f"{row['p50']:>9}{row['p95']:>9}{row['p99']:>9}{row.get('dbHits', '-'):>10}")
+        if baseline:
+            line += f"{baseline.get('tools', {}).get(tool, {}).get('p95', '-'):>10}"
+        print(line)
+        if "firstError" in row:
+            print(f"    first error: {row['firstError']}")
+
+
+def main():
+    """Run a load test against a toolbox server."""
+    parser = argparse.ArgumentParser(description="Load test the tools of a toolbox tools.yaml.")
+    parser.add_argument("tools_file", help="toolbox tools.yaml")
+    parser.add_argument("--url", default=TOOLBOX_URL, help="toolbox server url")
+    parser.add_argument("--workload", help="yaml workload file (weights and parameters)")
+    parser.add_argument("--replay", help="JSON lines invocation log to replay instead of the workload mix")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rate", type=float, help="open loop: calls per second")
+    mode.add_argument("--concurrency", type=int, default=8, help="closed loop: concurrent callers")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--timeout", type=float, default=30, help="per-call timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-db-hits", action="store_true", help="skip the PROFILE db hits pass")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run; exit 1 on regressions")
+    args = parser.parse_args()
+
+    workload = {}
+    if args.workload:
+        with open(args.workload) as f:
+            workload = yaml.safe_load(f) or {}
+    if args.replay:
+        source = Replay(args.replay)
+    else:
+        source = Workload(args.tools_file, workload, args.seed)
+        source.load_samples()
+
+    mode = f"{args.rate} calls/s" if args.rate else f"{args.concurrency} concurrent callers"
+    logging.info(f"Running for {args.duration}s at {mode} against {args.url}")
+    recorder = asyncio.run(run_load(source, args.url, args.rate, None if args.rate else args.concurrency,
+                                    args.duration, args.timeout))
+    summary = recorder.summary()
+    summary["mode"] = mode
+
+    if not args.no_db_hits:
+        for tool, hits in profile_db_hits(args.tools_file, source).items():
+            if tool in summary["tools"]:
+                summary["tools"][tool]["dbHits"] = hits
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if baseline:
+        regressions = compare(baseline, summary)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
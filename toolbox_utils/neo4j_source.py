@@ -0,0 +1,47 @@
+"""
+Helpers to connect to the Neo4j sources declared in an MCP Toolbox tools.yaml file.
+The scripts in this repo reuse the connection details of the toolbox server instead of
+keeping a second copy of the credentials.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import yaml
+from neo4j import Driver, GraphDatabase
+
+
+def load_tools_file(tools_file: str) -> Dict:
+    """Read and parse a toolbox tools.yaml file."""
+    with open(tools_file) as f:
+        return yaml.safe_load(f)
+
+
+def get_source_config(tools_file: str, source_name: Optional[str] = None) -> Dict:
+    """
+    Return the configuration of a neo4j source from a tools.yaml file.
+    If no source name is given the file must declare exactly one neo4j source.
+    """
+    sources = {
+        name: source
+        for name, source in (load_tools_file(tools_file).get("sources") or {}).items()
+        if source.get("kind") == "neo4j"
+    }
+    if source_name:
+        if source_name not in sources:
+            raise ValueError(f"Neo4j source '{source_name}' not found in {tools_file}")
+        return sources[source_name]
+    if len(sources) != 1:
+        raise ValueError(f"Expected one neo4j source in {tools_file}, found {len(sources)}. Pass a source name.")
+    return next(iter(sources.values()))
+
+
+def get_driver(tools_file: str, source_name: Optional[str] = None) -> Tuple[Driver, str]:
+    """
+    Create a Neo4j driver for a source in a tools.yaml file.
+    Returns the driver and the database name to pass to driver.session().
+    """
+    source = get_source_config(tools_file, source_name)
+    logging.info(f"Connecting to {source['uri']} (database: {source.get('database', 'neo4j')})")
+    driver = GraphDatabase.driver(source["uri"], auth=(source["user"], source["password"]))
+    return driver, source.get("database", "neo4j")